@@ -0,0 +1,72 @@
+"""
+Chromedriver helpers shared by sch.py and test2.py.
+"""
+import logging
+import os
+import subprocess
+
+# Path of chromedriver resolved by webdriver_manager, reused by the next runs
+CHROMEDRIVER_PATH_CACHE = ".chromedriver_path"
+
+
+def resolve_chromedriver_path(stale_path=None) -> str:
+    """
+    Returns the chromedriver path without network access when possible:
+      1) the CHROMEDRIVER_PATH environment variable (manually downloaded driver),
+      2) the path cached by a previous run in CHROMEDRIVER_PATH_CACHE,
+      3) otherwise ChromeDriverManager().install(), and caches its result.
+    stale_path: a path that failed to start Chrome; it is dropped from the cache instead of returned.
+    """
+    env_path = os.environ.get("CHROMEDRIVER_PATH")
+    if env_path:
+        return env_path
+
+    if os.path.exists(CHROMEDRIVER_PATH_CACHE):
+        with open(CHROMEDRIVER_PATH_CACHE, encoding="utf-8") as f:
+            cached_path = f.read().strip()
+        if cached_path and cached_path == stale_path:
+            os.remove(CHROMEDRIVER_PATH_CACHE)
+        elif cached_path and os.path.exists(cached_path):
+            return cached_path
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    driver_path = ChromeDriverManager().install()
+    try:
+        with open(CHROMEDRIVER_PATH_CACHE, "w", encoding="utf-8") as f:
+            f.write(driver_path)
+    except OSError as e:
+        logging.warning(f"Could not cache chromedriver path: {e}")
+    return driver_path
+
+
+def start_chrome(options, driver_path=None):
+    """
+    Starts Chrome with the given options and the chromedriver at driver_path
+    (resolve_chromedriver_path() if not given).
+    If that chromedriver no longer matches the installed Chrome (SessionNotCreatedException,
+    typically after a Chrome auto-update), the cached path is dropped and chromedriver
+    is resolved again once.
+    Returns (driver, driver_path); driver_path is the one that worked, for the next starts.
+    """
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.service import Service as ChromeService
+
+    def make_service(path):
+        service = ChromeService(executable_path=path)
+        if os.name == "nt":
+            # Do not open a console window for chromedriver on Windows
+            service.creation_flags = subprocess.CREATE_NO_WINDOW
+        return service
+
+    if driver_path is None:
+        driver_path = resolve_chromedriver_path()
+    try:
+        return webdriver.Chrome(service=make_service(driver_path), options=options), driver_path
+    except SessionNotCreatedException as e:
+        if os.environ.get("CHROMEDRIVER_PATH"):
+            raise
+        logging.warning(f"Chromedriver {driver_path} does not match Chrome ({e.msg}), resolving it again.")
+        driver_path = resolve_chromedriver_path(stale_path=driver_path)
+        return webdriver.Chrome(service=make_service(driver_path), options=options), driver_path
@@ -1,56 +1,294 @@
 import os
 import datetime
-import langid
 import pandas as pd
 import sqlite3
 import time
 import logging
+import random
 import re
 import traceback
-
+import asyncio
+import atexit
+import concurrent.futures
+import signal
+import sys
+
+import aiohttp
+import fasttext
+import httplib2
+from openpyxl import load_workbook
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
-# For Selenium
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
+# Selenium / webdriver_manager are imported lazily, only on the (rare) fallback path
+from chromedriver_utils import start_chrome
 from requests.exceptions import ConnectionError as RequestsConnectionError
 import urllib3.exceptions
 
+# ------------------------------------------------------------------------------
+# Language detection (fastText "lid.176" model, native code)
+# Download: https://dl.fbaipublicfiles.com/fasttext/supervised-models/lid.176.ftz
+# ------------------------------------------------------------------------------
+LID_MODEL_PATH = "lid.176.ftz"
+_LID = fasttext.load_model(LID_MODEL_PATH)
+
+# Words that practically only occur in French text. Accents or "de/la/les" alone
+# are not enough (Spanish, Portuguese, Italian...), so at least
+# FR_HINT_MIN_WORDS different ones must appear to skip the classifier.
+_FR_HINT_RE = re.compile(
+    r"\b(c['’]est|j['’]ai|qu['’]il|n['’]est|d['’]une?|aujourd['’]hui|pourquoi|"
+    r"avec|vous|nous|être|ça|très|beaucoup)\b",
+    re.IGNORECASE
+)
+FR_HINT_MIN_WORDS = 2
+
+
+def detect_languages(texts: list) -> list:
+    """
+    Returns (language, confidence) for every text, for example ("fr", 0.97),
+    classifying the whole list in one fastText call.
+    Empty/very short texts are not classified and give ("und", 0.0),
+    texts with obvious French words (_FR_HINT_RE) give ("fr", 1.0) without the model.
+    The caller truncates the texts (detection cost grows with their length).
+    """
+    texts = [t.replace("\n", " ") for t in texts]
+    results = [("und", 0.0)] * len(texts)
+    to_classify = []
+    for i, t in enumerate(texts):
+        if len(t.strip()) < 8:
+            continue
+        if len({w.lower() for w in _FR_HINT_RE.findall(t)}) >= FR_HINT_MIN_WORDS:
+            results[i] = ("fr", 1.0)
+        else:
+            to_classify.append(i)
+    if to_classify:
+        labels, probs = _LID.predict([texts[i] for i in to_classify], k=1)
+        for i, label, prob in zip(to_classify, labels, probs):
+            results[i] = (label[0][len("__label__"):], float(prob[0]))
+    return results
+
+
 # ------------------------------------------------------------------------------
 # FUNCTION: Retries for YouTube API (search.list and channels.list)
 # ------------------------------------------------------------------------------
-def youtube_api_call_with_retries(api_func, max_retries=3, sleep_seconds=5):
+# Errors that will not go away by retrying (bad request, auth, quotaExceeded, not found)
+NON_RETRYABLE_STATUSES = {400, 401, 403, 404}
+
+
+# Upper bound for a single backoff wait (Retry-After from the server may exceed it)
+BACKOFF_MAX_SECONDS = 60
+
+
+def backoff_delay(attempt, sleep_seconds, retry_after=None) -> float:
+    """
+    Exponential backoff with jitter: sleep_seconds * 2^(attempt-1) + [0, 1) s,
+    capped at BACKOFF_MAX_SECONDS, but not less than the server's
+    Retry-After (in seconds), if given.
+    """
+    try:
+        retry_after = int(retry_after or 0)
+    except ValueError:
+        retry_after = 0
+    delay = min(sleep_seconds * 2 ** (attempt - 1), BACKOFF_MAX_SECONDS)
+    return max(retry_after, delay) + random.uniform(0, 1)
+
+
+def youtube_api_call_with_retries(api_func, max_retries=5, sleep_seconds=2):
     """
     Calls api_func() (which should return an object on which .execute() is called),
-    and performs multiple retries in case of HttpError/connection issues
+    and performs multiple retries in case of transient HttpError (429, 5xx)/connection issues
     in order to bypass transient failures (ConnectionAbortedError, RemoteDisconnected, etc.).
+    Waits with exponential backoff between attempts (see backoff_delay).
 
-    Returns the response or None if all max_retries fail.
+    Returns the response or None if all max_retries fail
+    (immediately for NON_RETRYABLE_STATUSES, e.g. 403 quotaExceeded).
     """
     for attempt in range(1, max_retries + 1):
         try:
             response = api_func().execute()
             return response
-        except (HttpError, ConnectionAbortedError, OSError,
+        except HttpError as e:
+            status = e.resp.status
+            logging.error(f"[youtube_api_call_with_retries] Attempt {attempt}/{max_retries} -> HTTP {status}: {e}")
+            if status in NON_RETRYABLE_STATUSES:
+                logging.error(f"HTTP {status} is not retryable. Returning None.")
+                return None
+            delay = backoff_delay(attempt, sleep_seconds, e.resp.get("retry-after"))
+        except (ConnectionAbortedError, OSError,
                 urllib3.exceptions.ProtocolError,
                 RequestsConnectionError) as e:
             logging.error(f"[youtube_api_call_with_retries] Attempt {attempt}/{max_retries} -> error: {e}")
-            if attempt < max_retries:
-                logging.info(f"Waiting {sleep_seconds} seconds and then will retry...")
-                time.sleep(sleep_seconds)
-            else:
-                logging.error("Retry limit exceeded. Returning None.")
-                return None
+            delay = backoff_delay(attempt, sleep_seconds)
         except Exception as e2:
             logging.error(f"[youtube_api_call_with_retries] Unexpected error: {e2}")
             traceback.print_exc()
             return None
+
+        if attempt < max_retries:
+            logging.info(f"Waiting {delay:.1f} seconds and then will retry...")
+            time.sleep(delay)
+        else:
+            logging.error("Retry limit exceeded. Returning None.")
+            return None
     return None
 
 
+# ------------------------------------------------------------------------------
+# FUNCTION: Several YouTube API requests in one BatchHttpRequest
+# ------------------------------------------------------------------------------
+BATCH_MAX_REQUESTS = 50
+
+
+def youtube_batch_call_with_retries(youtube, api_funcs: dict, max_retries=5, sleep_seconds=2) -> dict:
+    """
+    Takes a dict key -> api_func (same kind of functions as for youtube_api_call_with_retries)
+    and sends the requests in BatchHttpRequest's of up to BATCH_MAX_REQUESTS,
+    so that they share a single HTTPS round-trip.
+
+    Requests that fail inside the batch (or the whole batch, on a connection error)
+    are retried one by one via youtube_api_call_with_retries.
+
+    Returns a dict key -> response (None if all retries failed).
+    """
+    keys = list(api_funcs)
+    responses = {}
+
+    def on_response(request_id, response, exception):
+        key = keys[int(request_id)]
+        if exception is not None:
+            logging.error(f"[youtube_batch_call_with_retries] Request for {key!r} -> error: {exception}")
+        else:
+            responses[key] = response
+
+    for start in range(0, len(keys), BATCH_MAX_REQUESTS):
+        batch = youtube.new_batch_http_request(callback=on_response)
+        for i in range(start, min(start + BATCH_MAX_REQUESTS, len(keys))):
+            batch.add(api_funcs[keys[i]](), request_id=str(i))
+        try:
+            batch.execute()
+        except (HttpError, ConnectionAbortedError, OSError,
+                urllib3.exceptions.ProtocolError,
+                RequestsConnectionError) as e:
+            logging.error(f"[youtube_batch_call_with_retries] Batch failed -> error: {e}")
+
+    # Retry the failed ones individually
+    for key in keys:
+        if key not in responses:
+            logging.info(f"Retrying request for {key!r} outside of the batch...")
+            responses[key] = youtube_api_call_with_retries(api_funcs[key], max_retries, sleep_seconds)
+    return responses
+
+
+# ------------------------------------------------------------------------------
+# FUNCTION: Get channel handles via plain HTTP (aiohttp, with retries)
+# ------------------------------------------------------------------------------
+# Handle in the initial HTML of a channel page: "canonicalBaseUrl":"/@Evel-901"
+_HANDLE_RE = re.compile(r'"canonicalBaseUrl":"/(@[^"]+)"')
+
+async def fetch_handle(session, channel_id: str, max_retries=3, sleep_seconds=5) -> str:
+    """
+    Downloads https://www.youtube.com/channel/<channel_id> and extracts the handle
+    from "canonicalBaseUrl":"/@..." in the initial HTML (no JS needed).
+
+    Returns something like '@Evel-901', "" if the channel page was loaded but has
+    no handle, or None if the lookup failed (network error, 429, consent page...).
+    Retries up to max_retries times on aiohttp network errors/timeouts.
+    """
+    url = f"https://www.youtube.com/channel/{channel_id}"
+    for attempt in range(1, max_retries + 1):
+        try:
+            async with session.get(url) as r:
+                status = r.status
+                html = await r.text()
+            if status == 404:
+                return ""
+            m = _HANDLE_RE.search(html)
+            if m:
+                return m.group(1)
+            # Only the real channel page (with its own externalId) proves that there is no handle
+            if status == 200 and f'"externalId":"{channel_id}"' in html:
+                return ""
+            logging.warning(f"[fetch_handle] No channel page for {channel_id} (HTTP {status}).")
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.error(f"[fetch_handle] Attempt {attempt}/{max_retries} -> error: {e}")
+            if attempt < max_retries:
+                logging.info(f"Waiting {sleep_seconds} seconds and then will retry HTTP...")
+                await asyncio.sleep(sleep_seconds)
+            else:
+                logging.error("HTTP retry limit exceeded.")
+                return None
+    return None
+
+
+# Max. number of channel pages downloaded at the same time (avoids YouTube rate limits)
+HTTP_CONCURRENCY = 16
+
+# Headers of a regular desktop browser: YouTube serves the full channel HTML
+# (with "canonicalBaseUrl") to them, unlike to unknown clients
+HTTP_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"),
+    "Accept-Language": "fr",
+}
+
+
+# One event loop and one aiohttp.ClientSession for the whole run (started on first use),
+# so the connections to www.youtube.com are reused from one search page to the next
+_http_loop = None
+_http_session = None
+
+
+def close_http_session():
+    """
+    Closes the shared aiohttp session and its event loop (if they were started).
+    """
+    global _http_loop, _http_session
+    if _http_loop is None:
+        return
+    if _http_session is not None:
+        _http_loop.run_until_complete(_http_session.close())
+        _http_session = None
+    _http_loop.close()
+    _http_loop = None
+
+
+def get_handles_http(channel_ids: list) -> dict:
+    """
+    Fetches the handles of all channel_ids concurrently (asyncio.gather,
+    at most HTTP_CONCURRENCY at a time) under the aiohttp.ClientSession shared
+    by the whole run, so TCP/TLS connections are pooled across calls.
+
+    Returns a dict channel_id -> handle ("" if the channel has none, None if the lookup failed).
+    """
+    global _http_loop
+    if not channel_ids:
+        return {}
+
+    if _http_loop is None:
+        _http_loop = asyncio.new_event_loop()
+        atexit.register(close_http_session)
+
+    async def run():
+        global _http_session
+        if _http_session is None:
+            timeout = aiohttp.ClientTimeout(total=30)
+            # All requests go to www.youtube.com: size the pool for HTTP_CONCURRENCY connections
+            connector = aiohttp.TCPConnector(limit=2 * HTTP_CONCURRENCY, limit_per_host=HTTP_CONCURRENCY)
+            _http_session = aiohttp.ClientSession(timeout=timeout, headers=HTTP_HEADERS, connector=connector)
+
+        sem = asyncio.Semaphore(HTTP_CONCURRENCY)
+
+        async def one(cid):
+            async with sem:
+                return await fetch_handle(_http_session, cid)
+
+        handles = await asyncio.gather(*(one(cid) for cid in channel_ids))
+        return dict(zip(channel_ids, handles))
+
+    return _http_loop.run_until_complete(run())
+
+
 # ------------------------------------------------------------------------------
 # FUNCTION: Get channel handle via Selenium (with retries)
 # ------------------------------------------------------------------------------
@@ -64,18 +302,25 @@ def get_handle_from_channel_id_selenium(channel_id: str,
            .yt-content-metadata-view-model-wiz__metadata-row--metadata-row-inline
            span.yt-core-attributed-string--link-inherit-color
 
-    Returns something like '@Evel-901' or None if not found.
+    Returns something like '@Evel-901', "" if the channel has no handle,
+    or None if the lookup failed.
     Tries up to max_retries times if webdriver_manager or the browser
-    throw a network error.
+    throw a network/driver error. A page without the handle element
+    is not retried (the channel simply has no handle).
     """
+    from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
 
     for attempt in range(1, max_retries + 1):
         try:
             return _try_open_channel_and_get_handle(channel_id)
+        except NoSuchElementException:
+            logging.info(f"[get_handle_from_channel_id_selenium] No handle element for {channel_id}.")
+            return ""
         except (RequestsConnectionError,
                 urllib3.exceptions.ProtocolError,
                 ConnectionAbortedError,
-                Exception) as e:
+                TimeoutException,
+                WebDriverException) as e:
             logging.error(f"[get_handle_from_channel_id_selenium] Attempt {attempt}/{max_retries} -> Error: {e}")
             traceback.print_exc()
             if attempt < max_retries:
@@ -87,79 +332,141 @@ def get_handle_from_channel_id_selenium(channel_id: str,
     return None
 
 
-def _try_open_channel_and_get_handle(channel_id: str) -> str:
+# Element with the handle on the rendered channel page
+_HANDLE_CSS = (
+    "div.yt-content-metadata-view-model-wiz__metadata-row"
+    ".yt-content-metadata-view-model-wiz__metadata-row--metadata-row-inline "
+    "span.yt-core-attributed-string--link-inherit-color"
+)
+
+# One Chrome instance is shared by all Selenium lookups of the run
+_driver = None
+_driver_path = None
+
+
+def get_driver():
     """
-    Actual logic for opening the browser + finding the handle.
-    Called by get_handle_from_channel_id_selenium in a retry loop.
+    Returns the shared Chrome WebDriver, starting it on first use.
+    ChromeDriverManager().install() is resolved only once per run,
+    the browser is closed at exit.
     """
-    logging.info(f"[_try_open_channel_and_get_handle] Starting for channel_id={channel_id}")
+    global _driver, _driver_path
+    if _driver is not None:
+        return _driver
+
+    from selenium import webdriver
 
     # --- ChromeOptions settings ---
     options = webdriver.ChromeOptions()
-    # Enable headless mode if desired:
-    # options.add_argument("--headless")
-
-    # Increase timeouts:
-    options.add_argument("--start-maximized")
-    options.page_load_strategy = "normal"
+    # Only one text node is read: no window, no GPU, no images/stylesheets
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+    })
+    # driver.get() returns at DOMContentLoaded, the handle <span> is awaited explicitly
+    options.page_load_strategy = "eager"
+
+    # The chromedriver path is resolved on the first start only (re-resolved if Chrome was updated)
+    _driver, _driver_path = start_chrome(options, _driver_path)
+    _driver.set_page_load_timeout(120)  # up to 120 seconds waiting for page load
+    atexit.register(quit_driver)
+    logging.info("[Selenium] WebDriver started.")
+    return _driver
+
+
+def quit_driver():
+    """
+    Closes the shared browser (if it was started).
+    """
+    global _driver
+    if _driver is not None:
+        logging.info("[Selenium] Closing the browser.")
+        try:
+            _driver.quit()
+        except Exception as e:
+            logging.warning(f"[Selenium] Error while closing the browser: {e}")
+        _driver = None
 
-    # If you already downloaded ChromeDriver manually, you can specify the path:
-    # driver_path = r"C:\path\to\chromedriver.exe"
-    # service = ChromeService(executable_path=driver_path)
-    # driver = webdriver.Chrome(service=service, options=options)
 
-    # Otherwise, try to download via webdriver_manager:
-    service = ChromeService(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+def _try_open_channel_and_get_handle(channel_id: str) -> str:
+    """
+    Actual logic for opening the channel page + finding the handle.
+    Called by get_handle_from_channel_id_selenium in a retry loop.
+    """
+    logging.info(f"[_try_open_channel_and_get_handle] Starting for channel_id={channel_id}")
 
-    # Set large timeouts
-    driver.set_page_load_timeout(120)  # up to 120 seconds waiting for page load
-    driver.implicitly_wait(30)         # up to 30 seconds waiting for elements
-    logging.info("[Selenium] WebDriver started, opening page...")
+    from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
 
+    driver = get_driver()
+    url = f"https://www.youtube.com/channel/{channel_id}"
     try:
-        url = f"https://www.youtube.com/channel/{channel_id}"
+        driver.delete_all_cookies()
         driver.get(url)
-
-        # Additional pause to ensure everything is loaded (banner, JS, etc.)
-        time.sleep(15)
-
-        logging.info("[Selenium] Looking for the required <span>...")
-
-        span_handle = driver.find_element(
-            By.CSS_SELECTOR,
-            "div.yt-content-metadata-view-model-wiz__metadata-row"
-            ".yt-content-metadata-view-model-wiz__metadata-row--metadata-row-inline "
-            "span.yt-core-attributed-string--link-inherit-color"
+    except TimeoutException:
+        raise
+    except WebDriverException:
+        # Broken session (crashed browser, InvalidSessionIdException, ...):
+        # drop the driver, the next retry starts a new one
+        logging.error("[Selenium] Browser session is broken, restarting it on the next attempt.")
+        quit_driver()
+        raise
+
+    # Wait until the required <span> appears (instead of a fixed pause)
+    logging.info("[Selenium] Waiting for the required <span>...")
+    try:
+        span_handle = WebDriverWait(driver, 20).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, _HANDLE_CSS))
         )
-
-        found_handle = span_handle.text.strip()
-        if found_handle:
-            logging.info(f"[Selenium] Found handle: {found_handle}")
-            return found_handle
-        else:
-            logging.warning("[Selenium] Span element found but text is empty.")
+    except TimeoutException:
+        if "consent." in driver.current_url:
+            # Redirected to the cookie consent page: the channel page was never shown
+            logging.warning(f"[Selenium] Consent page instead of the channel page of {channel_id}.")
             return None
+        # The page loaded, but the element never appeared: the channel has no handle
+        raise NoSuchElementException(f"Handle <span> not found for {channel_id}")
 
-    finally:
-        logging.info("[Selenium] Closing the browser.")
-        driver.quit()
+    found_handle = span_handle.text.strip()
+    if found_handle:
+        logging.info(f"[Selenium] Found handle: {found_handle}")
+        return found_handle
+    else:
+        logging.warning("[Selenium] Span element found but text is empty.")
+        return None
 
 
 # ------------------------------------------------------------------------------
 # MAIN FUNCTION
 # ------------------------------------------------------------------------------
+# Evaluated channels (subscribers + handle) are cached in SQLite for this long,
+# so the same channels are not re-checked on every run
+CHANNEL_CACHE_TTL = 7 * 24 * 3600  # seconds
+
+# channel_info.xlsx is rewritten at the end of the run and every N new channels
+EXCEL_CHECKPOINT_EVERY = 50
+
+
 def main():
     logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
     # Insert your own API key here
     DEVELOPER_KEY = "YOUR_API_KEY_HERE"
-    youtube = build("youtube", "v3", developerKey=DEVELOPER_KEY)
+    # A single httplib2.Http for all API calls (pages, batches, retries):
+    # it keeps the TLS connection to the API open between requests
+    http = httplib2.Http(cache=".http_cache", timeout=30)
+    youtube = build("youtube", "v3", developerKey=DEVELOPER_KEY, http=http)
 
     # Search settings: last year, region FR
     days_back = 365
-    published_after = datetime.datetime.utcnow() - datetime.timedelta(days=days_back)
-    published_after_str = published_after.isoformat("T") + "Z"
+    published_after = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days_back)
+    published_after_str = published_after.replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
     FRENCH_QUERIES = [
         "comment",
@@ -187,172 +494,394 @@ def main():
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
 
+    # WAL + NORMAL sync: a commit no longer needs two fsyncs
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
+
+    # WITHOUT ROWID: the primary key is the table itself (one B-tree per insert/lookup
+    # instead of the rowid table + a separate unique index)
+    row = cur.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name='processed_videos'"
+    ).fetchone()
+    if row and "WITHOUT ROWID" not in row[0].upper():
+        logging.info("Migrating processed_videos to a WITHOUT ROWID table...")
+        cur.executescript("""
+            BEGIN;
+            CREATE TABLE processed_videos_v2 (
+                video_id TEXT PRIMARY KEY
+            ) WITHOUT ROWID;
+            INSERT OR IGNORE INTO processed_videos_v2 (video_id) SELECT video_id FROM processed_videos;
+            DROP TABLE processed_videos;
+            ALTER TABLE processed_videos_v2 RENAME TO processed_videos;
+            COMMIT;
+        """)
+
     cur.execute("""
         CREATE TABLE IF NOT EXISTS processed_videos (
             video_id TEXT PRIMARY KEY
+        ) WITHOUT ROWID
+    """)
+    conn.commit()
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS channels_meta (
+            channel_id TEXT PRIMARY KEY,
+            subs INTEGER,
+            handle TEXT,
+            ts INTEGER
         )
     """)
     conn.commit()
 
+    # Channels evaluated by this or a recent run: channel_id -> (subs, handle or None)
+    min_ts = int(time.time()) - CHANNEL_CACHE_TTL
+    channel_cache = {
+        cid: (subs, handle)
+        for cid, subs, handle in cur.execute(
+            "SELECT channel_id, subs, handle FROM channels_meta WHERE ts >= ?", (min_ts,)
+        )
+    }
+    logging.info(f"Cached channels in DB: {len(channel_cache)}")
+
+    # Subscriber counts of every channel requested during this run
+    # (None = channel not found), so channels.list is called once per channel
+    channel_stats_cache = {}
+
+    # All processed video IDs in memory: O(1) checks without a query per video
+    seen = {r[0] for r in cur.execute("SELECT video_id FROM processed_videos")}
+    logging.info(f"Already processed videos in DB: {len(seen)}")
+
     # ----------------------------------------------------------------------
-    # Prepare Excel (channel_info.xlsx)
+    # Channels found so far: the "channels" table is the source of truth,
+    # Excel (channel_info.xlsx) is only an export written at exit
     # ----------------------------------------------------------------------
-    excel_path = "channel_info.xlsx"
-    if os.path.exists(excel_path):
-        df_channels = pd.read_excel(excel_path, engine="openpyxl")
-    else:
-        df_channels = pd.DataFrame(columns=["channel_handle", "subscribers"])
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS channels (
+            channel_handle TEXT PRIMARY KEY,
+            subscribers INTEGER
+        )
+    """)
+    conn.commit()
 
-    # Check columns
-    if "channel_handle" not in df_channels.columns:
-        df_channels["channel_handle"] = ""
-    if "subscribers" not in df_channels.columns:
-        df_channels["subscribers"] = 0
+    excel_path = "channel_info.xlsx"
+    known_handles = {r[0] for r in cur.execute("SELECT channel_handle FROM channels")}
+    if not known_handles and os.path.exists(excel_path):
+        # First run with the table: import the channels of the existing Excel file
+        # (read-only streaming, only the two needed columns)
+        wb_old = load_workbook(excel_path, read_only=True, data_only=True)
+        ws_old = wb_old.active
+        header = list(next(ws_old.iter_rows(max_row=1, values_only=True), ()))
+        if "channel_handle" in header:
+            handle_col = header.index("channel_handle")
+            subs_col = header.index("subscribers") if "subscribers" in header else None
+            rows = []
+            for row in ws_old.iter_rows(min_row=2, values_only=True):
+                handle = row[handle_col] if handle_col < len(row) else None
+                if handle is None:
+                    continue
+                subs = row[subs_col] if subs_col is not None and subs_col < len(row) else None
+                rows.append((str(handle), int(subs) if isinstance(subs, (int, float)) else 0))
+            cur.executemany("INSERT OR IGNORE INTO channels (channel_handle, subscribers) VALUES (?, ?)", rows)
+            conn.commit()
+            known_handles = {handle for handle, _ in rows}
+            logging.info(f"Imported {len(known_handles)} channels from {excel_path}.")
+        wb_old.close()
+
+    new_since_export = 0  # new channels since the last export
+
+    def export_excel():
+        nonlocal new_since_export
+        if not new_since_export:
+            return
+        try:
+            df_channels = pd.read_sql("SELECT channel_handle, subscribers FROM channels", conn)
+            df_channels.to_excel(excel_path, index=False, engine="openpyxl")
+        except PermissionError as pe:
+            logging.error(f"Could not save Excel {excel_path}: {pe}. The channels are kept in {db_path}.")
+            return
+        new_since_export = 0
+        logging.info(f"Exported {len(df_channels)} channels to {excel_path}.")
+
+    atexit.register(export_excel)
+    # Ctrl+C / kill -> regular exit, so that atexit handlers run
+    signal.signal(signal.SIGINT, lambda signum, frame: sys.exit(1))
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
 
     total_videos_fetched = 0
     total_new_channels = 0
 
     # ----------------------------------------------------------------------
-    # Loop over keywords, navigate search() results by pageToken
+    # Loop over keywords, navigate search() results by pageToken.
+    # Every round fetches the next page of all active queries in one batch.
     # ----------------------------------------------------------------------
+    # search().list() arguments of every query, only pageToken changes between pages
+    base_params = dict(
+        part="snippet",
+        type="video",
+        maxResults=50,
+        order="date",
+        publishedAfter=published_after_str,
+        regionCode="FR"
+    )
+    search_params = {query_str: dict(base_params, q=query_str) for query_str in FRENCH_QUERIES}
+
+    def make_search_call(query_str, page_token):
+        def search_api_call():
+            return youtube.search().list(pageToken=page_token, **search_params[query_str])
+        return search_api_call
+
+    def make_channels_call(channel_ids):
+        def channels_api_call():
+            return youtube.channels().list(
+                part="statistics",
+                id=",".join(channel_ids),
+                maxResults=50
+            )
+        return channels_api_call
+
+    # query -> (index of the last fetched page, pageToken of the next page)
+    active_queries = {query_str: (0, None) for query_str in FRENCH_QUERIES}
     for query_str in FRENCH_QUERIES:
         logging.info(f"=== Starting search for query '{query_str}' ===")
-        page_token = None
-        page_index = 0
-
-        while True:
-            page_index += 1
-            logging.info(f"[{query_str}] Page #{page_index}, pageToken={page_token!r}")
-
-            # Call search() with retries
-            def search_api_call():
-                return youtube.search().list(
-                    part="snippet",
-                    type="video",
-                    maxResults=50,
-                    order="date",
-                    publishedAfter=published_after_str,
-                    regionCode="FR",
-                    q=query_str,
-                    pageToken=page_token
-                )
-
-            search_response = youtube_api_call_with_retries(search_api_call, max_retries=3, sleep_seconds=5)
-            if not search_response:
-                logging.warning(f"[{query_str}] Error calling search().list, skipping the rest.")
-                break
-
-            items = search_response.get("items", [])
-            logging.info(f"[{query_str}] Page #{page_index} returned {len(items)} videos.")
-            if not items:
-                logging.info(f"[{query_str}] Empty result -> finishing.")
-                break
-
-            total_videos_fetched += len(items)
-
-            # Process videos
-            for idx, item in enumerate(items, start=1):
-                snippet = item.get("snippet", {})
-                video_id = item["id"].get("videoId")
-                channel_id = snippet.get("channelId", "")
-
-                logging.info(f"[{query_str} Pg#{page_index} Vid#{idx}] video_id={video_id}, channel_id={channel_id}")
-
-                # 1) Check if we already processed this video
-                cur.execute("SELECT 1 FROM processed_videos WHERE video_id=?", (video_id,))
-                row = cur.fetchone()
-                if row:
-                    logging.info(f"    -> Video {video_id} is already in DB, skipping.")
-                    continue
-
-                title = snippet.get("title", "")
-                description = snippet.get("description", "")
-
-                # Detect language
-                text_for_lang = f"{title}\n{description}"
-                lang_detected, conf = langid.classify(text_for_lang)
-                logging.info(f"    lang={lang_detected}, conf={conf:.4f}")
-                if lang_detected != "fr":
-                    logging.info("    -> Language != 'fr', skipping.")
-                    # Mark video as processed
-                    cur.execute("INSERT INTO processed_videos (video_id) VALUES (?)", (video_id,))
-                    conn.commit()
-                    continue
-
-                # 2) Request channel statistics (channels().list)
-                def channels_api_call():
-                    return youtube.channels().list(
-                        part="statistics",
-                        id=channel_id
-                    )
-
-                ch_resp = youtube_api_call_with_retries(channels_api_call, max_retries=3, sleep_seconds=5)
-                if not ch_resp:
-                    logging.warning(f"    -> channels().list returned None, skipping channel {channel_id}.")
-                    cur.execute("INSERT INTO processed_videos (video_id) VALUES (?)", (video_id,))
-                    conn.commit()
-                    continue
 
-                ch_items = ch_resp.get("items", [])
-                if not ch_items:
-                    logging.info(f"    -> Channel {channel_id} not found in response.")
-                    cur.execute("INSERT INTO processed_videos (video_id) VALUES (?)", (video_id,))
-                    conn.commit()
+    # Video IDs to mark as processed and evaluated channels, written in one
+    # transaction per search page (executemany) and also if the loop fails
+    pending_processed = []
+    pending_meta = []
+
+    def flush_pending():
+        with conn:
+            cur.executemany("INSERT OR IGNORE INTO processed_videos (video_id) VALUES (?)", pending_processed)
+            cur.executemany("INSERT OR REPLACE INTO channels_meta (channel_id, subs, handle, ts) VALUES (?, ?, ?, ?)", pending_meta)
+        pending_processed.clear()
+        pending_meta.clear()
+
+    def remember_channel(channel_id, subs_count, handle):
+        channel_cache[channel_id] = (subs_count, handle)
+        pending_meta.append((channel_id, subs_count, handle, int(time.time())))
+
+    def fetch_search_round(queries):
+        # Call search() for all given queries in one batch (with retries)
+        search_calls = {}
+        for query_str, (page_index, page_token) in queries.items():
+            logging.info(f"[{query_str}] Page #{page_index + 1}, pageToken={page_token!r}")
+            search_calls[query_str] = make_search_call(query_str, page_token)
+        return youtube_batch_call_with_retries(youtube, search_calls)
+
+    # The next round of search() runs in the background while the pages of the
+    # current round wait for their handle fetches. Only one thread uses the
+    # API client (httplib2 is not thread-safe) at any time.
+    api_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    try:
+        next_round = api_executor.submit(fetch_search_round, dict(active_queries))
+        while next_round is not None:
+            search_responses = next_round.result()
+
+            pages = []
+            for query_str, search_response in search_responses.items():
+                page_index = active_queries[query_str][0] + 1
+                if not search_response:
+                    logging.warning(f"[{query_str}] Error calling search().list, skipping the rest.")
+                    del active_queries[query_str]
                     continue
 
-                stats = ch_items[0].get("statistics", {})
-                subs_str = stats.get("subscriberCount", "0")
-                try:
-                    subs_count = int(subs_str)
-                except:
-                    subs_count = 0
-
-                logging.info(f"    -> Subscribers: {subs_count}")
-                if subs_count >= 50000:
-                    logging.info("    -> Too many subscribers (>=50k), skipping.")
-                    cur.execute("INSERT INTO processed_videos (video_id) VALUES (?)", (video_id,))
-                    conn.commit()
+                items = search_response.get("items", [])
+                logging.info(f"[{query_str}] Page #{page_index} returned {len(items)} videos.")
+                if not items:
+                    logging.info(f"[{query_str}] Empty result -> finishing.")
+                    del active_queries[query_str]
                     continue
 
-                # 3) The channel is suitable, get the handle via Selenium
-                logging.info("    -> Calling Selenium for handle...")
-                handle = get_handle_from_channel_id_selenium(channel_id, max_retries=3, sleep_seconds=5)
-                if not handle:
-                    logging.info("    -> Could not get handle, skipping channel.")
-                    cur.execute("INSERT INTO processed_videos (video_id) VALUES (?)", (video_id,))
-                    conn.commit()
-                    continue
+                total_videos_fetched += len(items)
+                pages.append((query_str, page_index, items))
 
-                # 4) Check duplicates in df_channels
-                if handle in df_channels["channel_handle"].values:
-                    logging.info(f"    -> Handle {handle} is already in Excel, skipping.")
+                # Next page
+                next_token = search_response.get("nextPageToken")
+                if next_token:
+                    active_queries[query_str] = (page_index, next_token)
                 else:
-                    # Add a new row
-                    logging.info(f"    -> New channel: handle={handle}, subs={subs_count}. Saving to Excel.")
-                    df_channels.loc[len(df_channels)] = [handle, subs_count]
+                    logging.info(f"[{query_str}] No more pages.")
+                    del active_queries[query_str]
+
+            # Request statistics for all (not cached) channels of this round in one batch
+            # (channels.list accepts up to 50 comma-separated IDs per request);
+            # videos already processed are skipped before any work, so their channels aren't requested
+            channel_ids = list({
+                it.get("snippet", {}).get("channelId", "")
+                for _, _, items in pages
+                for it in items
+                if it["id"].get("videoId") and it["id"]["videoId"] not in seen
+                and it.get("snippet", {}).get("channelId")
+                and it["snippet"]["channelId"] not in channel_cache
+                and it["snippet"]["channelId"] not in channel_stats_cache
+            })
+            channels_calls = {
+                i: make_channels_call(channel_ids[i:i + 50])
+                for i in range(0, len(channel_ids), 50)
+            }
+
+            ch_responses = list(youtube_batch_call_with_retries(youtube, channels_calls).items())
+
+            # Fall back to one request per channel for the chunks that failed
+            failed_ids = [
+                cid
+                for i, ch_resp in ch_responses if not ch_resp
+                for cid in channel_ids[i:i + 50]
+            ]
+            if failed_ids:
+                logging.warning(f"channels().list failed for {len(failed_ids)} channels, retrying them one by one.")
+                single_calls = {cid: make_channels_call([cid]) for cid in failed_ids}
+                ch_responses += youtube_batch_call_with_retries(youtube, single_calls, max_retries=1).items()
+
+            found = 0
+            for key, ch_resp in ch_responses:
+                if not ch_resp:
+                    continue
+                # Channels missing from a successful response do not exist -> None
+                for cid in (channel_ids[key:key + 50] if isinstance(key, int) else [key]):
+                    channel_stats_cache.setdefault(cid, None)
+                for ch_item in ch_resp.get("items", []):
+                    subs_str = ch_item.get("statistics", {}).get("subscriberCount", "0")
                     try:
-                        df_channels.to_excel(excel_path, index=False)
-                    except PermissionError as pe:
-                        logging.error(f"Could not save Excel {excel_path}: {pe}")
-                        # If there's a permission issue, data will be lost if the script fails later
-
-                    total_new_channels += 1
-
-                # 5) Mark this video as processed
-                cur.execute("INSERT INTO processed_videos (video_id) VALUES (?)", (video_id,))
-                conn.commit()
+                        channel_stats_cache[ch_item["id"]] = int(subs_str or 0)
+                    except:
+                        channel_stats_cache[ch_item["id"]] = 0
+                    found += 1
+            logging.info(f"Got statistics for {found}/{len(channel_ids)} channels.")
+
+            # Prefetch the next round while this one is processed
+            next_round = api_executor.submit(fetch_search_round, dict(active_queries)) if active_queries else None
+
+            for query_str, page_index, items in pages:
+                # 1) Keep only the videos not processed yet (in-memory set primed from DB)
+                new_items = [
+                    (idx, it) for idx, it in enumerate(items, start=1)
+                    if it["id"].get("videoId") not in seen
+                ]
+                if len(new_items) < len(items):
+                    logging.info(
+                        f"[{query_str} Pg#{page_index}] {len(items) - len(new_items)} videos already in DB, skipping."
+                    )
 
-            # Next page
-            page_token = search_response.get("nextPageToken")
-            if not page_token:
-                logging.info(f"[{query_str}] No more pages.")
-                break
+                # Detect the language of all new videos of the page in one call
+                texts = [
+                    (it.get("snippet", {}).get("title", "") + " " + it.get("snippet", {}).get("description", ""))[:300]
+                    for _, it in new_items
+                ]
+                langs = detect_languages(texts)
+
+                # Process videos: filter them and collect candidate channels
+                candidates = []  # (video_id, channel_id, subs_count)
+                for (idx, item), (lang_detected, conf) in zip(new_items, langs):
+                    snippet = item.get("snippet", {})
+                    video_id = item["id"].get("videoId")
+                    channel_id = snippet.get("channelId", "")
+
+                    logging.info(f"[{query_str} Pg#{page_index} Vid#{idx}] video_id={video_id}, channel_id={channel_id}")
+
+                    # Language (detected above for the whole page)
+                    logging.info(f"    lang={lang_detected}, conf={conf:.4f}")
+                    if lang_detected != "fr":
+                        logging.info("    -> Language != 'fr', skipping.")
+                        # Mark video as processed
+                        pending_processed.append((video_id,))
+                        seen.add(video_id)
+                        continue
+
+                    # 2) Look up channel statistics (cache or the batched channels().list)
+                    if channel_id in channel_cache:
+                        subs_count = channel_cache[channel_id][0]
+                    else:
+                        subs_count = channel_stats_cache.get(channel_id)
+                    if subs_count is None:
+                        logging.info(f"    -> Channel {channel_id} not found in response.")
+                        pending_processed.append((video_id,))
+                        seen.add(video_id)
+                        continue
+
+                    logging.info(f"    -> Subscribers: {subs_count}")
+                    if subs_count >= 50000:
+                        logging.info("    -> Too many subscribers (>=50k), skipping.")
+                        if channel_id not in channel_cache:
+                            remember_channel(channel_id, subs_count, None)
+                        pending_processed.append((video_id,))
+                        seen.add(video_id)
+                        continue
+
+                    candidates.append((video_id, channel_id, subs_count))
+
+                # 3) The channels are suitable, get their handles via HTTP (concurrently),
+                #    except for the ones already looked up (cache)
+                candidate_cids = list(dict.fromkeys(
+                    channel_id for _, channel_id, _ in candidates if channel_id not in channel_cache
+                ))
+                if candidate_cids:
+                    logging.info(f"[{query_str} Pg#{page_index}] Fetching handles for {len(candidate_cids)} channels via HTTP...")
+                handles = get_handles_http(candidate_cids)
+
+                # Fallback to Selenium for the channels where the HTML had no handle
+                for channel_id in candidate_cids:
+                    if not handles.get(channel_id):
+                        logging.info(f"    -> No handle in HTML for {channel_id}, calling Selenium...")
+                        selenium_handle = get_handle_from_channel_id_selenium(channel_id, max_retries=3, sleep_seconds=5)
+                        # A failed Selenium lookup doesn't override "no handle" from the HTML
+                        if selenium_handle is not None or handles.get(channel_id) is None:
+                            handles[channel_id] = selenium_handle
+
+                for video_id, channel_id, subs_count in candidates:
+                    if channel_id in channel_cache:
+                        handle = channel_cache[channel_id][1]
+                    else:
+                        handle = handles.get(channel_id)
+                        if handle is None:
+                            # The lookup failed: nothing is cached and the video is not marked
+                            # as processed, so the channel is looked up again later
+                            logging.info(f"    -> Handle lookup failed for {channel_id}, will retry later.")
+                            continue
+                        remember_channel(channel_id, subs_count, handle or None)
+                    if not handle:
+                        logging.info(f"    -> Could not get handle for {channel_id}, skipping channel.")
+                        pending_processed.append((video_id,))
+                        seen.add(video_id)
+                        continue
+
+                    # 4) Check duplicates among the known channels
+                    if handle in known_handles:
+                        logging.info(f"    -> Handle {handle} is already known, skipping.")
+                    else:
+                        # Add a new row (committed with the page, Excel is written at exit)
+                        logging.info(f"    -> New channel: handle={handle}, subs={subs_count}.")
+                        known_handles.add(handle)
+                        cur.execute("INSERT OR IGNORE INTO channels (channel_handle, subscribers) VALUES (?, ?)",
+                                    (handle, subs_count))
+                        new_since_export += 1
+
+                        total_new_channels += 1
+
+                    # 5) Mark this video as processed
+                    pending_processed.append((video_id,))
+                    seen.add(video_id)
+
+                # One transaction (one fsync) per search page
+                flush_pending()
+
+                # Checkpoint: refresh the Excel export every EXCEL_CHECKPOINT_EVERY new channels
+                if new_since_export >= EXCEL_CHECKPOINT_EVERY:
+                    export_excel()
+    finally:
+        api_executor.shutdown(wait=True, cancel_futures=True)
+        flush_pending()
 
     # Final
     logging.info("===== RESULT =====")
     logging.info(f"Total videos scanned: {total_videos_fetched} (across all keywords).")
     logging.info(f"New channels added: {total_new_channels}.")
 
+    export_excel()
+    # Exported (or already reported as failed): the exit hook must not read the closed connection
+    atexit.unregister(export_excel)
     conn.close()
     logging.info("Script finished.")
 
@@ -1,22 +1,35 @@
-import time
 import os
 import re
-from datetime import datetime
+import csv
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import signal
+import sys
+import multiprocessing
+import concurrent.futures
+from dataclasses import dataclass
+from multiprocessing.util import Finalize
+from urllib.parse import urlsplit, urlunsplit
+
+import httplib2
+import requests
 
 # For YouTube Data API
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
 from googleapiclient.errors import HttpError
 
 # Selenium
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 
-# webdriver-manager
-from webdriver_manager.chrome import ChromeDriverManager
+# chromedriver path (webdriver-manager), shared with sch.py
+from chromedriver_utils import resolve_chromedriver_path, start_chrome
 
 # openpyxl
 from openpyxl import Workbook, load_workbook
@@ -24,138 +37,314 @@ from openpyxl import Workbook, load_workbook
 # ====== Settings ======
 XLSX_INPUT = "channel_info.xlsx"       # Input file
 XLSX_OUTPUT = "final_channels.xlsx"    # Output file for results
+CSV_OUTPUT = "final_channels.csv"      # Append-only progress file (one row per channel), exported to XLSX_OUTPUT
 
 # Your API key for the YouTube Data API
 DEVELOPER_KEY = "YOUR_API_KEY_HERE"
+# Discovery document of the API, downloaded once; the clients are built from it offline
+DISCOVERY_CACHE = "youtube_v3_discovery.json"
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/youtube/v3/rest"
 
 MAX_CHANNELS = None  # Limit for the number of channels to process, or None for no limit
+NUM_WORKERS = 4      # Number of channels processed in parallel (one Chrome per worker process)
+# Max. number of videos per channel checked for shorts/likes/comments, or None for all videos.
+# For bigger channels the counts are extrapolated from the newest MAX_SHORTS_SCAN uploads.
+MAX_SHORTS_SCAN = 500
+MAX_RETRIES = 5      # Retries (exponential backoff) of an API request on rate limits/server errors
+# API responses are cached in SQLite for this long, so re-runs don't spend quota on the same requests
+API_CACHE_DB = "yt_cache.db"
+API_CACHE_TTL = 24 * 3600  # seconds
+CHANNEL_ID_CACHE_TTL = 30 * 24 * 3600  # handle -> channelId lookups (same file), seconds
+
+# HTTP session (keep-alive, reused across channels) for pages that don't need a browser.
+# Headers of a regular desktop browser: YouTube serves the full channel HTML to them.
+HTTP_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"),
+    "Accept-Language": "en-US",
+}
+SESSION = requests.Session()
+SESSION.headers.update(HTTP_HEADERS)
 
 def iso_to_readable(iso_dt_str: str) -> str:
     """
     Takes a string in ISO-8601 format, for example "2025-03-17T16:00:01Z",
     and returns "YYYY-MM-DD HH:MM:SS" (UTC).
+    The API always sends this fixed shape, so it is sliced instead of parsed.
     """
-    if not iso_dt_str:
-        return ""
-    try:
-        iso_dt_str = iso_dt_str.replace("Z", "+00:00")
-        dt = datetime.fromisoformat(iso_dt_str)
-        return dt.strftime("%Y-%m-%d %H:%M:%S")
-    except:
-        return iso_dt_str
+    if len(iso_dt_str) >= 19 and iso_dt_str[10] == "T":
+        return f"{iso_dt_str[:10]} {iso_dt_str[11:19]}"
+    return iso_dt_str
 
 
-def get_webdriver():
+def get_webdriver(driver_path=None):
     """
     Configure ChromeDriver.
+    driver_path: chromedriver resolved once by main(), so the workers don't each ask webdriver_manager.
     """
     chrome_options = Options()
     chrome_options.add_argument("--lang=en-US")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--disable-software-rasterizer")
-    # chrome_options.add_argument("--headless")  # If needed
+    chrome_options.add_argument("--headless=new")  # One Chrome per worker, no windows needed
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-notifications")
-
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    # Only text/HTML is read: don't download images, stylesheets, fonts, plugins
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+        "profile.managed_default_content_settings.plugins": 2,
+    })
+    # driver.get() returns at DOMContentLoaded, the elements are awaited with wait_for()
+    chrome_options.page_load_strategy = "eager"
+
+    driver, _ = start_chrome(chrome_options, driver_path)
     driver.set_window_size(1920, 1080)
     return driver
 
 
+def wait_for(driver, css_selector: str, timeout=10) -> bool:
+    """
+    Waits until an element matching css_selector is present (instead of a fixed sleep).
+    Returns False if it did not appear within timeout seconds.
+    """
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, css_selector))
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
 def normalize_channel_url(raw_url: str) -> str:
     """
     Transforms a handle/partial link into a formal channel URL
     + adds ?hl=en&gl=US.
     """
     raw_url = raw_url.strip()
-    if raw_url.startswith("http://") or raw_url.startswith("https://"):
-        if "hl=en" not in raw_url and "gl=US" not in raw_url:
-            if "?" in raw_url:
-                raw_url += "&hl=en&gl=US"
-            else:
-                raw_url += "?hl=en&gl=US"
-        return raw_url
+    if raw_url.startswith(("http://", "https://")):
+        if "hl=en" in raw_url or "gl=US" in raw_url:
+            return raw_url
     else:
-        raw_url = raw_url.lstrip("/")
-        full_url = "https://www.youtube.com/" + raw_url
-        if "?" in full_url:
-            full_url += "&hl=en&gl=US"
-        else:
-            full_url += "?hl=en&gl=US"
-        return full_url
+        raw_url = "https://www.youtube.com/" + raw_url.lstrip("/")
+    return raw_url + ("&" if "?" in raw_url else "?") + "hl=en&gl=US"
+
+
+def normalize_handle_key(raw_handle) -> str:
+    """
+    Key of a channel for the already-processed check: '@Handle', '/@handle' and
+    'https://www.youtube.com/@handle?hl=en' all give '@handle'.
+    Handles are case-insensitive, /channel/UC... ids are kept as they are.
+    """
+    path = urlsplit(normalize_channel_url(str(raw_handle))).path.strip("/")
+    return path.lower() if path.startswith("@") else path
+
+
+def channel_tab_url(channel_url: str, tab: str) -> str:
+    """
+    URL of a tab ("about", "channels", ...) of the channel, with ?hl=en&gl=US.
+    """
+    parts = urlsplit(channel_url)
+    return urlunsplit(parts._replace(path=parts.path.rstrip("/") + "/" + tab, query="hl=en&gl=US", fragment=""))
+
 
+# Both patterns in one alternation: the page is scanned once
+_CID_RE = re.compile(
+    r'<link\s+rel="canonical"\s+href="https://www\.youtube\.com/channel/(UC[0-9A-Za-z_\-]+)"'  # 1) canonical
+    r'|"channelId":"(UC[0-9A-Za-z_\-]+)"'                                                    # 2) in script
+)
 
-def get_channel_id_from_handle_selenium(handle: str) -> str:
+
+def extract_channel_id(page_source: str) -> str:
     """
-    Opens https://www.youtube.com/<handle> and tries to extract channelId.
+    Extracts channelId from the HTML of a channel page.
     Looks for <link rel="canonical" href=".../channel/UCxxx" /> or "channelId":"UCxxx".
     Returns 'UCxxx...' or "" if not found.
+    The canonical link is in <head>, before the page scripts, so it is normally the first match.
     """
-    driver_local = get_webdriver()
-    try:
-        handle_str = handle.lstrip("/")
-        url = f"https://www.youtube.com/{handle_str}"
-        print(f"[LOG] -> Opening for channelId lookup: {url}")
-        driver_local.get(url)
-        time.sleep(5)
+    m = _CID_RE.search(page_source)
+    if m:
+        # 1) <link rel="canonical" href="https://www.youtube.com/channel/UCxxxx"/>
+        if m.group(1):
+            print(f"[LOG] -> Found channelId via canonical: {m.group(1)}")
+            return m.group(1)
+        # 2) "channelId":"UCxxxx"
+        print(f"[LOG] -> Found channelId in script: {m.group(2)}")
+        return m.group(2)
 
-        page_source = driver_local.page_source
+    print("[LOG] -> Could not find channelId.")
+    return ""
 
-        # 1) <link rel="canonical" href="https://www.youtube.com/channel/UCxxxx"/>
-        canon_regex = r'<link\s+rel="canonical"\s+href="https://www\.youtube\.com/channel/(UC[0-9A-Za-z_\-]+)"'
-        m1 = re.search(canon_regex, page_source)
-        if m1:
-            cid = m1.group(1)
-            print(f"[LOG] -> Found channelId via canonical: {cid}")
-            return cid
 
-        # 2) "channelId":"UCxxxx"
-        chid_regex = r'"channelId":"(UC[0-9A-Za-z_\-]+)"'
-        m2 = re.search(chid_regex, page_source)
-        if m2:
-            cid = m2.group(1)
-            print(f"[LOG] -> Found channelId in script: {cid}")
-            return cid
-
-        print("[LOG] -> Could not find channelId.")
+def get_channel_id_from_handle_http(handle: str) -> str:
+    """
+    Downloads the channel page of <handle> with a plain HTTP GET (no browser)
+    and extracts channelId from it.
+    Returns 'UCxxx...' or "" if not found.
+    """
+    url = normalize_channel_url(handle)
+    print(f"[LOG] -> Downloading for channelId lookup: {url}")
+    try:
+        page_source = SESSION.get(url, timeout=10).text
+    except requests.RequestException as e:
+        print(f"[LOG] -> HTTP error extracting channelId: {e}")
         return ""
+    return extract_channel_id(page_source)
+
+
+_INITIAL_DATA_RE = re.compile(r'var ytInitialData = ({.+?});</script>', re.DOTALL)
+
+
+def extract_initial_data(page_source: str):
+    """
+    Parses the ytInitialData JSON embedded in the HTML of a YouTube page.
+    Returns the parsed dict or None if not found/invalid.
+    """
+    m = _INITIAL_DATA_RE.search(page_source)
+    if not m:
+        return None
+    try:
+        return json.loads(m.group(1))
+    except ValueError:
+        return None
+
+
+def count_json_keys(node, keys) -> int:
+    """
+    Counts the objects having one of the given keys anywhere in a JSON tree.
+    """
+    count = 0
+    stack = [node]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            count += sum(1 for k in keys if k in cur)
+            stack.extend(cur.values())
+        elif isinstance(cur, list):
+            stack.extend(cur)
+    return count
+
+
+def find_json_key(node, key):
+    """
+    Returns the value of the first object having the given key anywhere in a JSON tree, or None.
+    """
+    stack = [node]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            if key in cur:
+                return cur[key]
+            stack.extend(cur.values())
+        elif isinstance(cur, list):
+            stack.extend(cur)
+    return None
+
+
+def get_following_channels_http(channels_url: str):
+    """
+    Downloads the CHANNELS tab with a plain HTTP GET and counts the channel entries
+    (gridChannelRenderer / channelRenderer, like the ytd-* elements Selenium would count)
+    in its ytInitialData.
+    Returns the count or None if the page could not be parsed.
+    """
+    try:
+        page_source = SESSION.get(channels_url, timeout=10).text
+    except requests.RequestException as e:
+        print(f"[LOG] -> HTTP error loading the channels tab: {e}")
+        return None
+    initial_data = extract_initial_data(page_source)
+    if initial_data is None:
+        return None
+    return count_json_keys(initial_data, ("gridChannelRenderer", "channelRenderer"))
+
+
+def parse_about_initial_data(initial_data) -> dict:
+    """
+    Reads from the ytInitialData of the ABOUT tab:
+    the description (channelMetadataRenderer, where the emails are),
+    the country and the joined date (aboutChannelViewModel, if present).
+    Returns {"description", "country", "joined"}.
+    """
+    metadata = initial_data.get("metadata", {}).get("channelMetadataRenderer", {})
+    about = find_json_key(initial_data, "aboutChannelViewModel") or {}
+    joined = about.get("joinedDateText", {})
+    return {
+        "description": metadata.get("description") or about.get("description", ""),
+        "country": about.get("country", ""),
+        "joined": joined.get("content", "") if isinstance(joined, dict) else "",
+    }
+
+
+def get_about_http(about_url: str):
+    """
+    Downloads the ABOUT tab with a plain HTTP GET and parses its ytInitialData (parse_about_initial_data).
+    Returns {"description", "country", "joined"} or None if the page could not be parsed.
+    """
+    try:
+        page_source = SESSION.get(about_url, timeout=10).text
+    except requests.RequestException as e:
+        print(f"[LOG] -> HTTP error loading the about tab: {e}")
+        return None
+    initial_data = extract_initial_data(page_source)
+    if initial_data is None:
+        return None
+    return parse_about_initial_data(initial_data)
+
+
+def get_channel_id_from_handle_selenium(driver, handle: str) -> str:
+    """
+    Same as get_channel_id_from_handle_http, but opens the channel page in the given driver
+    (fallback when the plain HTTP page has no channelId).
+    Returns 'UCxxx...' or "" if not found.
+    The page stays open, so the caller can scrape it without loading it again.
+    """
+    try:
+        url = normalize_channel_url(handle)
+        print(f"[LOG] -> Opening for channelId lookup: {url}")
+        driver.get(url)
+        wait_for(driver, "link[rel='canonical']")
+        return extract_channel_id(driver.page_source)
 
     except Exception as e:
         print(f"[LOG] -> Error extracting channelId: {e}")
         return ""
-    finally:
-        driver_local.quit()
+
+
+_SUBS_MULTIPLIERS = {"k": 1000, "m": 1000000, "b": 1000000000}
+_SUBS_STRIP = str.maketrans("", "", " ,")  # drops spaces and thousands separators
 
 
 def parse_subscribers_to_int(subs_text):
     """
-    Converts a string like "12.3K subscribers" -> 12300, etc.
+    Converts a string like "12.3K subscribers" -> 12300, "1.2B" -> 1200000000,
+    "1,234 subscribers" -> 1234, "1 subscriber" -> 1.
     """
     if not subs_text:
         return None
-    text = subs_text.lower().replace("subscribers", "").strip()
-    text = text.replace(" ", "").replace(",", "")
+    text = subs_text.lower().translate(_SUBS_STRIP).removesuffix("subscribers").removesuffix("subscriber")
 
     try:
-        if text.endswith("k"):
-            val = text[:-1]
-            return int(float(val) * 1000)
-        elif text.endswith("m"):
-            val = text[:-1]
-            return int(float(val) * 1000000)
-        else:
+        multiplier = _SUBS_MULTIPLIERS.get(text[-1:])
+        if multiplier is None:
             return int(float(text))
-    except:
+        # round(): float(4.35) * 1000 is 4349.999...
+        return round(float(text[:-1]) * multiplier)
+    except Exception:
         return None
 
 
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9_.+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z0-9-.]+')
+
+
 def extract_emails_from_text(text):
     """
     Looks for emails in text (regex).
     """
-    pattern = r'[a-zA-Z0-9_.+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z0-9-.]+'
-    return re.findall(pattern, text)
+    return _EMAIL_RE.findall(text)
 
 
 def guess_name_surname(channel_name):
@@ -168,6 +357,9 @@ def guess_name_surname(channel_name):
     return ""
 
 
+_LOCATION_RE = re.compile(r'(Location[:\s]+[^\n]+|Lives in\s+[^\n]+)', re.IGNORECASE)
+
+
 def get_city_country_from_about(driver):
     """
     Tries to find "Location: ..." or "Lives in ..." on the About tab.
@@ -176,89 +368,51 @@ def get_city_country_from_about(driver):
         about_sections = driver.find_elements(By.CSS_SELECTOR, "ytd-channel-about-metadata-renderer div#description-container")
         if about_sections:
             text = about_sections[0].text
-            location_pattern = r'(Location[:\s]+[^\n]+|Lives in\s+[^\n]+)'
-            match = re.search(location_pattern, text, re.IGNORECASE)
+            match = _LOCATION_RE.search(text)
             if match:
                 return match.group(1).strip()
-    except:
+    except Exception:
         pass
     return ""
 
-
-def sum_likes_comments_via_api(video_ids, developer_key=DEVELOPER_KEY):
-    """
-    Sums likeCount and commentCount for a list of videos (videoIds) via API.
-    """
-    if not video_ids:
-        return (0, 0)
-
-    youtube = build("youtube", "v3", developerKey=developer_key)
-    total_likes = 0
-    total_comments = 0
-
-    chunk_size = 50
-    for i in range(0, len(video_ids), chunk_size):
-        chunk = video_ids[i:i+chunk_size]
-        id_str = ",".join(chunk)
-        try:
-            response = youtube.videos().list(
-                part="statistics",
-                id=id_str
-            ).execute()
-        except HttpError as e:
-            # Check if the quota has been exceeded
-            if e.resp.status in [403, 429] or 'quotaExceeded' in str(e.content):
-                print("[LOG] -> YouTube Data API quotaExceeded. Stopping processing.")
-                raise  # Re-raise exception to stop the script
-            else:
-                print(f"[LOG] -> HttpError while getting video statistics: {e}")
-                continue
-
-        items = response.get("items", [])
-        for it in items:
-            stats = it.get("statistics", {})
-            like_str = stats.get("likeCount", "0")
-            comm_str = stats.get("commentCount", "0")
-
-            try:
-                total_likes += int(like_str)
-            except:
-                pass
-            try:
-                total_comments += int(comm_str)
-            except:
-                pass
-
-    return (total_likes, total_comments)
+# Partial responses ("fields"): only the fields read below are sent by the API
+PLAYLIST_ITEMS_FIELDS = "items(contentDetails(videoId,videoPublishedAt)),nextPageToken"
+VIDEOS_FIELDS = "items(contentDetails/duration,statistics(likeCount,commentCount))"
+CHANNELS_FIELDS = ("items(snippet(title,publishedAt,country),topicDetails/topicCategories,"
+                   "contentDetails/relatedPlaylists/uploads,"
+                   "statistics(viewCount,subscriberCount,hiddenSubscriberCount))")
 
 
-def get_newest_and_oldest_video_date_in_playlist(playlist_id: str, youtube) -> tuple:
+def get_playlist_videos(playlist_id: str, youtube) -> tuple:
     """
-    Finds the newest (max) and oldest (min) videoPublishedAt in the uploads playlist.
-    Returns (newest, oldest) in ISO format.
+    Walks the uploads playlist once and collects all videoIds together with
+    the newest (max) and oldest (min) videoPublishedAt.
+    Returns (video_ids, newest, oldest), dates in ISO format.
     """
     if not playlist_id:
-        return ("", "")
+        return ([], "", "")
 
+    video_ids = []
     newest_date = ""
     oldest_date = ""
     next_page_token = None
 
     while True:
         try:
-            resp = youtube.playlistItems().list(
+            resp = cached_execute(youtube.playlistItems().list(
                 part="contentDetails",
                 playlistId=playlist_id,
                 maxResults=50,
-                pageToken=next_page_token
-            ).execute()
+                pageToken=next_page_token,
+                fields=PLAYLIST_ITEMS_FIELDS
+            ))
         except HttpError as e:
             # Check if the quota has been exceeded
-            if e.resp.status in [403, 429] or 'quotaExceeded' in str(e.content):
+            if is_quota_error(e):
                 print("[LOG] -> YouTube Data API quotaExceeded. Stopping processing.")
                 raise
             else:
-                print(f"[LOG] -> HttpError while getting playlist: {e}")
+                print(f"[LOG] -> HttpError while getting playlistItems: {e}")
                 break
 
         items = resp.get("items", [])
@@ -266,7 +420,9 @@ def get_newest_and_oldest_video_date_in_playlist(playlist_id: str, youtube) -> t
             break
 
         for item in items:
-            vid_pub = item["contentDetails"].get("videoPublishedAt", "")
+            cdetails = item["contentDetails"]
+            video_ids.append(cdetails["videoId"])
+            vid_pub = cdetails.get("videoPublishedAt", "")
             if not vid_pub:
                 continue
             if newest_date == "" or vid_pub > newest_date:
@@ -278,7 +434,7 @@ def get_newest_and_oldest_video_date_in_playlist(playlist_id: str, youtube) -> t
         if not next_page_token:
             break
 
-    return (newest_date, oldest_date)
+    return (video_ids, newest_date, oldest_date)
 
 
 def chunked(iterable, n):
@@ -289,438 +445,892 @@ def chunked(iterable, n):
         yield iterable[i:i+n]
 
 
+_DURATION_UNITS = {"H": 3600, "M": 60, "S": 1}
+
+
 def parse_duration_to_seconds(duration_iso8601: str) -> int:
     """
     Converts an ISO 8601 duration (e.g. 'PT4M13S', 'PT59S', 'PT1H2M30S') to an integer number of seconds.
+    Single pass over the (short) string, no regex: digits build up a number,
+    the unit letter after them multiplies it.
     """
-    pattern = re.compile(
-        r'PT'                  # constant prefix
-        r'(?:(\d+)H)?'         # hours (\d+H) – optional
-        r'(?:(\d+)M)?'         # minutes (\d+M) – optional
-        r'(?:(\d+)S)?'         # seconds (\d+S) – optional
-    )
-    match = pattern.match(duration_iso8601)
-    if not match:
+    if not duration_iso8601.startswith("PT"):
         return 0
 
-    hours = int(match.group(1) or 0)
-    minutes = int(match.group(2) or 0)
-    seconds = int(match.group(3) or 0)
-    return hours * 3600 + minutes * 60 + seconds
+    total = 0
+    num = 0
+    for c in duration_iso8601[2:]:
+        if c.isdigit():
+            num = num * 10 + (ord(c) - 48)
+        else:
+            total += num * _DURATION_UNITS.get(c, 0)
+            num = 0
+    return total
 
 
-def process_channel(driver, raw_channel_handle):
+def is_short(duration_iso8601: str) -> bool:
     """
-    Main logic:
-      1) Get channelId via Selenium
-      2) Via API (part="snippet,brandingSettings,topicDetails,contentDetails,statistics")
-         get creation_date_api, country, topics,
-         first/last video published, total_views,
-         also the uploads playlist to count total_videos, num_videos (non-shorts), num_shorts
-      3) Via Selenium collect email, subscriber count, city/country (About), etc.
-      4) Sum up likes/comments (estimated_likes, estimated_comments) via API.
-    """
-    data = {
-        "channel_id": "",
-        "channel_name": "",
-        "first_last_name": "",
-        "city_country": "",
-        "email": "",
-        "num_subscribers": None,
-
-        "total_videos": 0,  # all videos (including shorts)
-        "num_videos": 0,    # normal (non-shorts)
-        "num_shorts": 0,    # shorts
-        "total_views": None,
-
-        "channel_creation_date_api": "",
-        "channel_country_api": "",
-        "channel_topics_api": "",
-        "first_video_published_api": "",
-        "last_video_published_api": "",
-
-        # These fields are collected but not used in the final output:
-        "creation_date": "",
-        "first_video_date": "",
-        "last_video_date": "",
-
-        "num_following_channels": 0,
-        "estimated_likes": 0,
-        "estimated_comments": 0
-    }
+    True if the ISO 8601 duration is ≤ 60 seconds (a short).
+    Most videos have hours or several minutes: those are rejected from the unit letters alone,
+    only the rest is parsed. Durations with days ('P1DT2H') or 'P0D' (upcoming live) are not shorts.
+    """
+    if not duration_iso8601.startswith("PT") or "H" in duration_iso8601:
+        return False
+    m = duration_iso8601.find("M")
+    if m != -1 and duration_iso8601[2:m] not in ("0", "1"):
+        return False
+    return parse_duration_to_seconds(duration_iso8601) <= 60
 
-    print(f"[LOG] => Starting channel processing: {raw_channel_handle}")
 
-    # 1) Get channelId via Selenium
-    channel_id = get_channel_id_from_handle_selenium(raw_channel_handle)
-    data["channel_id"] = channel_id
+_api_cache = threading.local()  # SQLite connection of this thread, see get_api_cache()
 
-    # Create YouTube Data API client
-    youtube = build("youtube", "v3", developerKey=DEVELOPER_KEY)
 
-    if channel_id:
+def get_api_cache():
+    """
+    Opens the SQLite cache of API responses (once per thread: the worker's main thread
+    looks up channelIds while its API thread caches the responses).
+    """
+    conn = getattr(_api_cache, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(API_CACHE_DB, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")  # workers read while another one writes
+        conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, json BLOB, expires INTEGER)")
+        # Expired responses are never read again: drop them, so the file doesn't grow from run to run
+        conn.execute("DELETE FROM cache WHERE expires <= ?", (int(time.time()),))
+        conn.commit()
+        _api_cache.conn = conn
+    return conn
+
+
+def api_cache_key(request) -> str:
+    """
+    Cache key of an API request: hash of its URI (endpoint + all parameters).
+    """
+    return hashlib.sha256(request.uri.encode("utf-8")).hexdigest()
+
+
+def cache_get(key: str):
+    """
+    Returns the cached (not expired) value of key, or None.
+    """
+    row = get_api_cache().execute(
+        "SELECT json FROM cache WHERE key=? AND expires>?", (key, int(time.time()))
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def cache_put(key: str, value, ttl=API_CACHE_TTL):
+    """
+    Stores value (JSON-serializable) under key for ttl seconds.
+    """
+    cache = get_api_cache()
+    cache.execute(
+        "INSERT OR REPLACE INTO cache (key, json, expires) VALUES (?, ?, ?)",
+        (key, json.dumps(value), int(time.time()) + ttl)
+    )
+    cache.commit()
+
+
+def cached_execute(request, ttl=API_CACHE_TTL):
+    """
+    request.execute(num_retries=MAX_RETRIES), answered from the SQLite cache when possible.
+    Raises HttpError like execute(); errors are not cached.
+    """
+    key = api_cache_key(request)
+    response = cache_get(key)
+    if response is None:
+        response = request.execute(num_retries=MAX_RETRIES)
+        cache_put(key, response, ttl)
+    return response
+
+
+BATCH_MAX_REQUESTS = 50  # videos.list calls (of 50 ids each) sent in one batch HTTP request
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+# 403 reasons that only concern the requested resource (e.g. a private uploads playlist):
+# the channel is saved without that data and the run goes on
+PER_RESOURCE_REASONS = {"playlistItemsNotAccessible"}
+
+
+def http_error_reason(e) -> str:
+    """
+    Returns the reason of a YouTube Data API HttpError (e.g. 'quotaExceeded'), or "".
+    """
+    try:
+        return json.loads(e.content)["error"]["errors"][0]["reason"]
+    except Exception:
+        return ""
+
+
+def is_quota_error(e) -> bool:
+    """
+    True if the HttpError means the processing must stop: any 403/429 — quotaExceeded,
+    rate limiting left after the retries, or a key problem (accessNotConfigured, forbidden, ...)
+    that would fail every request — except the PER_RESOURCE_REASONS.
+    """
+    return e.resp.status in [403, 429] and http_error_reason(e) not in PER_RESOURCE_REASONS
+
+
+def is_transient_error(e) -> bool:
+    """
+    True if the HttpError is worth retrying: server errors, 429 and 403 rate limits.
+    Same rule as execute(num_retries=...); quotaExceeded is not transient.
+    """
+    status = e.resp.status
+    return status >= 500 or status == 429 or (status == 403 and http_error_reason(e) in RATE_LIMIT_REASONS)
+
+
+def get_videos_stats(youtube, video_ids) -> tuple:
+    """
+    One videos.list pass (part="contentDetails,statistics") over video_ids, 50 ids per call,
+    with the calls packed into batch HTTP requests (BATCH_MAX_REQUESTS calls per round trip)
+    and the responses cached in API_CACHE_DB.
+    Returns (short_count, total_likes, total_comments, videos_found); shorts are videos ≤ 60 seconds.
+    Re-raises HttpError on quotaExceeded.
+    """
+    totals = {"shorts": 0, "likes": 0, "comments": 0, "videos": 0}
+    quota_errors = []
+    retry_calls = []  # sub-requests that failed with a transient error
+
+    def add_items(response):
+        for item in response.get("items", []):
+            totals["videos"] += 1
+            stats = item.get("statistics", {})
+            try:
+                totals["likes"] += int(stats.get("likeCount", "0"))
+            except Exception:
+                pass
+            try:
+                totals["comments"] += int(stats.get("commentCount", "0"))
+            except Exception:
+                pass
+
+            dur_str = item.get("contentDetails", {}).get("duration", "")
+            if not dur_str:
+                # If there is no "duration" key or it's empty, skip it
+                continue
+            if is_short(dur_str):
+                totals["shorts"] += 1
+
+    def on_response(request_id, response, exception):
+        if exception is None:
+            add_items(response)
+            cache_put(api_cache_key(calls[int(request_id)]), response)
+        elif isinstance(exception, HttpError) and is_transient_error(exception):
+            retry_calls.append(calls[int(request_id)])
+        elif isinstance(exception, HttpError) and is_quota_error(exception):
+            quota_errors.append(exception)
+        else:
+            print(f"[LOG] -> HttpError while getting videos: {exception}")
+
+    # Calls answered from the cache are counted right away, only the others go to the batches
+    calls = []
+    for batch in chunked(video_ids, 50):
+        call = youtube.videos().list(part="contentDetails,statistics", id=",".join(batch), fields=VIDEOS_FIELDS)
+        cached = cache_get(api_cache_key(call))
+        if cached is None:
+            calls.append(call)
+        else:
+            add_items(cached)
+    for start in range(0, len(calls), BATCH_MAX_REQUESTS):
+        batch_calls = calls[start:start + BATCH_MAX_REQUESTS]
+        batch = youtube.new_batch_http_request(callback=on_response)
+        for i, call in enumerate(batch_calls, start=start):
+            batch.add(call, request_id=str(i))
         try:
-            # Request channel data, including statistics
+            batch.execute()
+        except HttpError as e:
+            if is_transient_error(e):
+                retry_calls.extend(batch_calls)
+            elif is_quota_error(e):
+                quota_errors.append(e)
+            else:
+                print(f"[LOG] -> HttpError while getting videos (batch): {e}")
+        except (OSError, httplib2.HttpLib2Error) as e:
+            # Dropped connection, socket timeout, SSL error: batch.execute() has no retries
+            print(f"[LOG] -> Connection error while getting videos (batch), retrying its calls: {e!r}")
+            retry_calls.extend(batch_calls)
+
+        # Batched sub-requests have no num_retries: retry the transient failures one by one
+        # (a connection error left after the retries fails the channel, see process_channel_in_worker)
+        for call in retry_calls:
+            if quota_errors:
+                break
             try:
-                channel_response = youtube.channels().list(
-                    part="snippet,brandingSettings,topicDetails,contentDetails,statistics",
-                    id=channel_id
-                ).execute()
+                add_items(cached_execute(call))
             except HttpError as e:
-                # Check if the quota has been exceeded
-                if e.resp.status in [403, 429] or 'quotaExceeded' in str(e.content):
-                    print("[LOG] -> YouTube Data API quotaExceeded. Stopping processing.")
-                    raise
+                if is_quota_error(e):
+                    quota_errors.append(e)
                 else:
-                    print(f"[LOG] -> HttpError while requesting channel API: {e}")
-                    return data  # Return whatever we have
-
-            ch_items = channel_response.get("items", [])
-            if ch_items:
-                channel_data = ch_items[0]
-
-                # snippet
-                snippet = channel_data.get("snippet", {})
-                published_at = snippet.get("publishedAt", "")
-                data["channel_creation_date_api"] = iso_to_readable(published_at)
-                data["channel_country_api"] = snippet.get("country", "")
-
-                # topicDetails
-                topic_details = channel_data.get("topicDetails", {})
-                topic_categories = topic_details.get("topicCategories", [])
-                cleaned_topics = []
-                for tcat in topic_categories:
-                    if "wikipedia.org/wiki/" in tcat:
-                        part = tcat.split("/wiki/")[-1].replace("_", " ")
-                        cleaned_topics.append(part)
-                    else:
-                        cleaned_topics.append(tcat)
-                data["channel_topics_api"] = ", ".join(cleaned_topics)
-
-                # statistics
-                stats = channel_data.get("statistics", {})
-                view_count = stats.get("viewCount")
-                data["total_views"] = int(view_count) if view_count else None
-
-                # contentDetails (we get the uploads playlist)
-                content_details = channel_data.get("contentDetails", {})
-                rplaylists = content_details.get("relatedPlaylists", {})
-                uploads_playlist_id = rplaylists.get("uploads", "")
-
-                # Determine the newest/oldest video dates
-                newest_date, oldest_date = get_newest_and_oldest_video_date_in_playlist(
-                    uploads_playlist_id, youtube
-                )
-                data["last_video_published_api"]  = iso_to_readable(newest_date)
-                data["first_video_published_api"] = iso_to_readable(oldest_date)
-
-                # Collect all videoIds from the uploads playlist
-                all_video_ids = []
-                next_page_token = None
-                while True:
-                    try:
-                        playlist_resp = youtube.playlistItems().list(
-                            part="contentDetails",
-                            playlistId=uploads_playlist_id,
-                            maxResults=50,
-                            pageToken=next_page_token
-                        ).execute()
-                    except HttpError as e:
-                        if e.resp.status in [403, 429] or 'quotaExceeded' in str(e.content):
-                            print("[LOG] -> YouTube Data API quotaExceeded. Stopping processing.")
-                            raise
-                        else:
-                            print(f"[LOG] -> HttpError while getting playlistItems: {e}")
-                            break
-
-                    items_page = playlist_resp.get("items", [])
-                    if not items_page:
-                        break
-
-                    for pli_item in items_page:
-                        vid_id = pli_item["contentDetails"]["videoId"]
-                        all_video_ids.append(vid_id)
-
-                    next_page_token = playlist_resp.get("nextPageToken")
-                    if not next_page_token:
-                        break
-
-                # Count how many of them are shorts (≤ 60 seconds)
-                short_count = 0
-                for batch in chunked(all_video_ids, 50):
-                    batch_str = ",".join(batch)
-                    try:
-                        videos_resp = youtube.videos().list(
-                            part="contentDetails",
-                            id=batch_str
-                        ).execute()
-                    except HttpError as e:
-                        if e.resp.status in [403, 429] or 'quotaExceeded' in str(e.content):
-                            print("[LOG] -> YouTube Data API quotaExceeded. Stopping processing.")
-                            raise
-                        else:
-                            print(f"[LOG] -> HttpError while getting videos: {e}")
-                            continue
-
-                    for item in videos_resp.get("items", []):
-                        cdetails = item.get("contentDetails", {})
-                        dur_str = cdetails.get("duration", "")
-                        if not dur_str:
-                            # If there is no "duration" key or it's empty,
-                            # skip or consider it 0 seconds.
-                            continue
-
-                        seconds = parse_duration_to_seconds(dur_str)
-                        if seconds <= 60:
-                            short_count += 1
-
-                # total_videos = everything
-                data["total_videos"] = len(all_video_ids)
-                # num_shorts = number of short videos
-                data["num_shorts"] = short_count
-                # num_videos = total minus shorts
-                data["num_videos"] = data["total_videos"] - data["num_shorts"]
-
-                # Summarize likes/comments for all videos (including shorts)
-                if all_video_ids:
-                    try:
-                        tlikes, tcomms = sum_likes_comments_via_api(all_video_ids, DEVELOPER_KEY)
-                        data["estimated_likes"] = tlikes
-                        data["estimated_comments"] = tcomms
-                    except HttpError:
-                        # If we caught quotaExceeded inside sum_likes_comments_via_api, will exit in the caller
-                        pass
+                    print(f"[LOG] -> HttpError while getting videos: {e}")
+        retry_calls.clear()
 
-        except HttpError:
-            # If quotaExceeded occurred somewhere inside, we stop
-            print("[LOG] -> Stopping (quotaExceeded).")
-            raise
+        if quota_errors:
+            print("[LOG] -> YouTube Data API quotaExceeded. Stopping processing.")
+            raise quota_errors[0]
 
-    # 3) Collect data with Selenium (subscribers, email, city/country from About, etc.)
-    try:
-        channel_url = normalize_channel_url(raw_channel_handle)
-        print(f"[LOG] => Constructed channel URL: {channel_url}")
-        driver.get(channel_url)
-        time.sleep(3)
+    return (totals["shorts"], totals["likes"], totals["comments"], totals["videos"])
 
-        # Close cookies banner if it appears
+
+def fetch_channel_api(youtube, channel_id: str) -> dict:
+    """
+    API part of process_channel (part="snippet,brandingSettings,topicDetails,contentDetails,statistics"):
+    creation_date_api, country, topics, first/last video published, total_views,
+    total_videos, num_videos (non-shorts), num_shorts and estimated likes/comments.
+    Returns the fields to merge into the channel data; re-raises HttpError on quotaExceeded.
+    """
+    api_data = {}
+    try:
+        # Request channel data, including statistics
         try:
-            cookie_btn = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button[aria-label^='Accept the use of cookies']"))
-            )
-            cookie_btn.click()
+            channel_response = cached_execute(youtube.channels().list(
+                part="snippet,brandingSettings,topicDetails,contentDetails,statistics",
+                id=channel_id,
+                fields=CHANNELS_FIELDS
+            ))
+        except HttpError as e:
+            # Check if the quota has been exceeded
+            if is_quota_error(e):
+                print("[LOG] -> YouTube Data API quotaExceeded. Stopping processing.")
+                raise
+            else:
+                print(f"[LOG] -> HttpError while requesting channel API: {e}")
+                return api_data  # No API data for this channel
+
+        ch_items = channel_response.get("items", [])
+        if ch_items:
+            channel_data = ch_items[0]
+
+            # snippet
+            snippet = channel_data.get("snippet", {})
+            channel_name = snippet.get("title", "")
+            if channel_name:
+                api_data["channel_name"] = channel_name
+                api_data["first_last_name"] = guess_name_surname(channel_name)
+            published_at = snippet.get("publishedAt", "")
+            api_data["channel_creation_date_api"] = iso_to_readable(published_at)
+            api_data["channel_country_api"] = snippet.get("country", "")
+
+            # topicDetails
+            topic_details = channel_data.get("topicDetails", {})
+            topic_categories = topic_details.get("topicCategories", [])
+            cleaned_topics = []
+            for tcat in topic_categories:
+                if "wikipedia.org/wiki/" in tcat:
+                    part = tcat.split("/wiki/")[-1].replace("_", " ")
+                    cleaned_topics.append(part)
+                else:
+                    cleaned_topics.append(tcat)
+            api_data["channel_topics_api"] = ", ".join(cleaned_topics)
+
+            # statistics
+            stats = channel_data.get("statistics", {})
+            view_count = stats.get("viewCount")
+            api_data["total_views"] = int(view_count) if view_count else None
+            subscriber_count = stats.get("subscriberCount")
+            if subscriber_count and not stats.get("hiddenSubscriberCount"):
+                api_data["num_subscribers"] = int(subscriber_count)
+
+            # contentDetails (we get the uploads playlist)
+            content_details = channel_data.get("contentDetails", {})
+            rplaylists = content_details.get("relatedPlaylists", {})
+            uploads_playlist_id = rplaylists.get("uploads", "")
+
+            # Collect all videoIds from the uploads playlist and determine
+            # the newest/oldest video dates (single pass over the playlist)
+            all_video_ids, newest_date, oldest_date = get_playlist_videos(uploads_playlist_id, youtube)
+            api_data["last_video_published_api"]  = iso_to_readable(newest_date)
+            api_data["first_video_published_api"] = iso_to_readable(oldest_date)
+
+            # Count how many of them are shorts (≤ 60 seconds)
+            # and sum likes/comments for all videos (including shorts)
+            scan_ids = all_video_ids if MAX_SHORTS_SCAN is None else all_video_ids[:MAX_SHORTS_SCAN]
+            short_count, total_likes, total_comments, classified = get_videos_stats(youtube, scan_ids)
+            if classified and len(scan_ids) < len(all_video_ids):
+                # Only a sample was checked: assume the other uploads have the same
+                # share of shorts and the same average likes/comments
+                ratio = len(all_video_ids) / classified
+                print(f"[LOG] -> Checked {classified}/{len(all_video_ids)} videos, extrapolating (x{ratio:.2f}).")
+                short_count = min(round(short_count * ratio), len(all_video_ids))
+                total_likes = round(total_likes * ratio)
+                total_comments = round(total_comments * ratio)
+
+            # total_videos = everything
+            api_data["total_videos"] = len(all_video_ids)
+            # num_shorts = number of short videos
+            api_data["num_shorts"] = short_count
+            # num_videos = total minus shorts
+            api_data["num_videos"] = api_data["total_videos"] - api_data["num_shorts"]
+
+            api_data["estimated_likes"] = total_likes
+            api_data["estimated_comments"] = total_comments
+
+    except HttpError:
+        # If quotaExceeded occurred somewhere inside, we stop
+        print("[LOG] -> Stopping (quotaExceeded).")
+        raise
+
+    return api_data
+
+
+@dataclass(slots=True)
+class ChannelRecord:
+    """
+    Data collected for one channel by process_channel.
+    """
+    channel_id: str = ""
+    channel_name: str = ""
+    first_last_name: str = ""
+    city_country: str = ""
+    email: str = ""
+    num_subscribers: int | None = None
+
+    total_videos: int = 0  # all videos (including shorts)
+    num_videos: int = 0    # normal (non-shorts)
+    num_shorts: int = 0    # shorts
+    total_views: int | None = None
+
+    channel_creation_date_api: str = ""
+    channel_country_api: str = ""
+    channel_topics_api: str = ""
+    first_video_published_api: str = ""
+    last_video_published_api: str = ""
+
+    # These fields are collected but not used in the final output:
+    creation_date: str = ""
+    first_video_date: str = ""
+    last_video_date: str = ""
+
+    num_following_channels: int = 0
+    estimated_likes: int = 0
+    estimated_comments: int = 0
+
+    def update(self, fields: dict):
+        """
+        Sets the given fields (e.g. the dict returned by fetch_channel_api).
+        """
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+
+CHANNEL_NAME_CSS = "h1.dynamic-text-view-model-wiz__h1 span"
+ABOUT_DESCRIPTION_CSS = "div#description-container, yt-formatted-string#description"
+# Channel description from ytInitialData (same field as parse_about_initial_data reads)
+ABOUT_DESCRIPTION_JS = "return window.ytInitialData?.metadata?.channelMetadataRenderer?.description || '';"
+COOKIES_BUTTON_CSS = "button[aria-label^='Accept the use of cookies']"
+
+
+def close_cookies_banner(driver, content_css: str):
+    """
+    Waits for content_css (or the cookies banner) to be rendered and closes the banner if it appears.
+    """
+    wait_for(driver, f"{content_css}, {COOKIES_BUTTON_CSS}")
+    try:
+        cookie_btns = driver.find_elements(By.CSS_SELECTOR, COOKIES_BUTTON_CSS)
+        if cookie_btns:
+            cookie_btns[0].click()
             print("[LOG] => Cookies banner found and closed.")
-            time.sleep(2)
-        except:
-            print("[LOG] => Cookies banner not found/not clickable.")
+            wait_for(driver, content_css)
+        else:
+            print("[LOG] => Cookies banner not found.")
+    except Exception:
+        print("[LOG] => Cookies banner not clickable.")
 
-        # Channel name
-        try:
-            h1_elem = driver.find_element(By.CSS_SELECTOR, "h1.dynamic-text-view-model-wiz__h1 span")
-            channel_name = h1_elem.text.strip()
-            print(f"[LOG] => Channel name (Selenium): {channel_name}")
-            data["channel_name"] = channel_name
-            data["first_last_name"] = guess_name_surname(channel_name)
-        except:
-            print("[LOG] => Could not find h1.dynamic-text-view-model-wiz__h1 span")
-
-        # Subscribers
-        try:
-            subs_elem = driver.find_element(By.XPATH, "//span[contains(text(),'subscriber')]")
-            subs_text = subs_elem.text.strip()
-            data["num_subscribers"] = parse_subscribers_to_int(subs_text)
-            print(f"[LOG] => Subscribers (Selenium): {subs_text} -> {data['num_subscribers']}")
-        except:
-            print("[LOG] => Could not find subscriber count (Selenium).")
-
-        # ABOUT tab
-        about_url = channel_url.split("?")[0].rstrip("/") + "/about?hl=en&gl=US"
-        print("[LOG] => Going to ABOUT tab:", about_url)
-        driver.get(about_url)
-        time.sleep(2)
-
-        # Email
-        try:
-            desc_elems = driver.find_elements(By.CSS_SELECTOR, "div#description-container, yt-formatted-string#description")
-            big_text = ""
-            for d in desc_elems:
-                big_text += d.text + "\n"
-            emails = extract_emails_from_text(big_text)
+
+def scrape_channel_header(driver, data):
+    """
+    Reads the channel name and subscriber count from the opened channel page into data (ChannelRecord).
+    """
+    close_cookies_banner(driver, CHANNEL_NAME_CSS)
+
+    # Channel name
+    try:
+        h1_elem = driver.find_element(By.CSS_SELECTOR, CHANNEL_NAME_CSS)
+        channel_name = h1_elem.text.strip()
+        print(f"[LOG] => Channel name (Selenium): {channel_name}")
+        data.channel_name = channel_name
+        data.first_last_name = guess_name_surname(channel_name)
+    except Exception:
+        print("[LOG] => Could not find h1.dynamic-text-view-model-wiz__h1 span")
+
+    # Subscribers
+    try:
+        subs_elem = driver.find_element(By.XPATH, "//span[contains(text(),'subscriber')]")
+        subs_text = subs_elem.text.strip()
+        data.num_subscribers = parse_subscribers_to_int(subs_text)
+        print(f"[LOG] => Subscribers (Selenium): {subs_text} -> {data.num_subscribers}")
+    except Exception:
+        print("[LOG] => Could not find subscriber count (Selenium).")
+
+
+def scrape_about_selenium(driver, about_url, data):
+    """
+    Opens the ABOUT tab in the driver and reads the email, city/country and joined date into data
+    (fallback when its ytInitialData could not be read over HTTP).
+    """
+    print("[LOG] => Going to ABOUT tab:", about_url)
+    driver.get(about_url)
+    close_cookies_banner(driver, ABOUT_DESCRIPTION_CSS)
+
+    # Email: from the description in the page's ytInitialData (a single script call that
+    # returns only that string); the text of the description elements only if it has none
+    try:
+        description = driver.execute_script(ABOUT_DESCRIPTION_JS)
+        emails = extract_emails_from_text(description) if isinstance(description, str) else []
+        if not emails:
+            desc_elems = driver.find_elements(By.CSS_SELECTOR, ABOUT_DESCRIPTION_CSS)
+            emails = extract_emails_from_text("\n".join(d.text for d in desc_elems))
+        if emails:
+            data.email = emails[0]
+            print("[LOG] => Found email:", data.email)
+    except Exception:
+        print("[LOG] => Could not extract email.")
+
+    # City/country
+    city_country = get_city_country_from_about(driver)
+    if city_country:
+        data.city_country = city_country
+        print("[LOG] => City/country (Selenium):", city_country)
+
+    # Creation date (Selenium) — (stored but not displayed)
+    try:
+        dt_joined = driver.find_element(By.XPATH, "//yt-formatted-string[contains(text(),'Joined')]").text.strip()
+        dt_joined = dt_joined.replace("Joined", "").strip()
+        data.creation_date = dt_joined
+    except Exception:
+        pass
+
+
+def process_channel(driver, youtube, raw_channel_handle, api_executor=None):
+    """
+    Main logic:
+      1) Get channelId via HTTP (Selenium as a fallback)
+      2) Via API (part="snippet,brandingSettings,topicDetails,contentDetails,statistics")
+         get creation_date_api, country, topics,
+         first/last video published, total_views,
+         also the uploads playlist to count total_videos, num_videos (non-shorts), num_shorts
+      3) From the ytInitialData of the About/Channels tabs (plain HTTP) collect email, city/country, etc.
+         (Selenium only if a page can't be parsed; channel name and subscriber count come from the API)
+      4) Sum up likes/comments (estimated_likes, estimated_comments) via API
+         (same videos.list call as the shorts detection).
+    Steps 2) and 4) (fetch_channel_api) run on api_executor, if given, concurrently with 3).
+    """
+    data = ChannelRecord()
+
+    print(f"[LOG] => Starting channel processing: {raw_channel_handle}")
+
+    # 1) Get channelId: from the cache of earlier runs, else via HTTP; Selenium only if that fails
+    #    (it opens the channel page in the shared driver, the scraping below reuses it)
+    page_loaded = False
+    channel_id_key = "channel_id:" + normalize_handle_key(raw_channel_handle)
+    channel_id = cache_get(channel_id_key) or ""
+    if channel_id:
+        print(f"[LOG] -> channelId from cache: {channel_id}")
+    else:
+        channel_id = get_channel_id_from_handle_http(raw_channel_handle)
+        if not channel_id:
+            channel_id = get_channel_id_from_handle_selenium(driver, raw_channel_handle)
+            page_loaded = bool(channel_id)
+        if channel_id:
+            cache_put(channel_id_key, channel_id, CHANNEL_ID_CACHE_TTL)
+    data.channel_id = channel_id
+
+    # 2) API requests: in the background (api_executor) while Selenium loads the pages below
+    api_future = None
+    if channel_id:
+        if api_executor is not None:
+            api_future = api_executor.submit(fetch_channel_api, youtube, channel_id)
+        else:
+            data.update(fetch_channel_api(youtube, channel_id))
+
+    # 3) Collect the page data (email, city/country from About, etc.)
+    channel_url = normalize_channel_url(raw_channel_handle)
+    print(f"[LOG] => Constructed channel URL: {channel_url}")
+    try:
+        if page_loaded:
+            # The channel page is already open (channelId fallback), read it while it's there
+            scrape_channel_header(driver, data)
+
+        # ABOUT tab: read from the ytInitialData of the plain HTML, Selenium only if that fails
+        about_url = channel_tab_url(channel_url, "about")
+        about = get_about_http(about_url)
+        if about is not None:
+            print("[LOG] => ABOUT tab (ytInitialData):", about_url)
+            emails = extract_emails_from_text(about["description"])
             if emails:
-                data["email"] = emails[0]
-                print("[LOG] => Found email:", data["email"])
-        except:
-            print("[LOG] => Could not extract email.")
-
-        # City/country
-        city_country = get_city_country_from_about(driver)
-        if city_country:
-            data["city_country"] = city_country
-            print("[LOG] => City/country (Selenium):", city_country)
-
-        # Creation date (Selenium) — (stored but not displayed)
-        try:
-            dt_joined = driver.find_element(By.XPATH, "//yt-formatted-string[contains(text(),'Joined')]").text.strip()
-            dt_joined = dt_joined.replace("Joined", "").strip()
-            data["creation_date"] = dt_joined
-        except:
-            pass
-
-        # CHANNELS tab (how many channels this author is following)
-        channels_url = channel_url.split("?")[0].rstrip("/") + "/channels?hl=en&gl=US"
-        driver.get(channels_url)
-        time.sleep(2)
-        try:
-            channels = driver.find_elements(By.CSS_SELECTOR, "ytd-grid-channel-renderer, ytd-channel-renderer")
-            data["num_following_channels"] = len(channels)
-        except:
-            data["num_following_channels"] = 0
+                data.email = emails[0]
+                print("[LOG] => Found email:", data.email)
+            # Same "Location: / Lives in" match as on the Selenium path, the About country otherwise
+            match = _LOCATION_RE.search(about["description"])
+            city_country = match.group(1).strip() if match else about["country"]
+            if city_country:
+                data.city_country = city_country
+                print("[LOG] => City/country (ytInitialData):", city_country)
+            # Creation date — (stored but not displayed)
+            data.creation_date = about["joined"].replace("Joined", "").strip()
+        else:
+            scrape_about_selenium(driver, about_url, data)
+
+        # CHANNELS tab (how many channels this author is following):
+        # counted in the ytInitialData of the plain HTML, Selenium only if that fails
+        channels_url = channel_tab_url(channel_url, "channels")
+        num_following = get_following_channels_http(channels_url)
+        if num_following is not None:
+            data.num_following_channels = num_following
+            print(f"[LOG] => Following channels (ytInitialData): {num_following}")
+        else:
+            driver.get(channels_url)
+            # No renderer at all if the channel follows nobody, so don't wait long
+            wait_for(driver, "ytd-grid-channel-renderer, ytd-channel-renderer", timeout=5)
+            try:
+                channels = driver.find_elements(By.CSS_SELECTOR, "ytd-grid-channel-renderer, ytd-channel-renderer")
+                data.num_following_channels = len(channels)
+            except Exception:
+                data.num_following_channels = 0
 
     except Exception as e:
         print(f"!!! Error processing channel {raw_channel_handle}: {e}")
 
+    if api_future is not None:
+        # Re-raises HttpError (quotaExceeded) of the API requests
+        data.update(api_future.result())
+
+    # Channel name and subscribers come from the API (snippet.title, statistics.subscriberCount);
+    # the channel page is only opened if the API had no data for this channel
+    if not data.channel_name:
+        try:
+            driver.get(channel_url)
+            scrape_channel_header(driver, data)
+        except Exception as e:
+            print(f"!!! Error processing channel {raw_channel_handle}: {e}")
+
     print("[LOG] => Finished processing channel:", raw_channel_handle)
     print("-"*60)
     return data
 
 
-def main():
-    driver = get_webdriver()
+# ====== Worker processes ======
+# Selenium is not thread-safe, so channels are processed in separate processes,
+# each one with its own long-lived Chrome instance and YouTube Data API client.
+_worker_driver = None
+_worker_youtube = None
+_worker_api_executor = None  # API requests of a channel run here while Chrome loads its pages
+_worker_args = ("", None)    # (discovery_doc, driver_path) given to init_worker
+
+
+def _quit_worker_driver():
+    try:
+        _worker_driver.quit()
+    except Exception:
+        pass
+
+
+def load_discovery_document() -> str:
+    """
+    Returns the YouTube Data API discovery document, downloaded once to DISCOVERY_CACHE.
+    Returns "" if it cannot be downloaded (the clients are then built with build()).
+    """
+    if os.path.exists(DISCOVERY_CACHE):
+        with open(DISCOVERY_CACHE, encoding="utf-8") as f:
+            discovery_doc = f.read()
+        try:
+            json.loads(discovery_doc)
+            return discovery_doc
+        except ValueError:
+            print(f"[LOG] -> {DISCOVERY_CACHE} is not valid JSON, downloading it again.")
+
+    try:
+        resp = SESSION.get(DISCOVERY_URL, timeout=30)
+        resp.raise_for_status()
+    except requests.RequestException as e:
+        print(f"[LOG] -> Could not download the discovery document: {e}")
+        return ""
+    # Written to a temporary file first: an interrupted run never leaves a partial document
+    with open(DISCOVERY_CACHE + ".tmp", "w", encoding="utf-8") as f:
+        f.write(resp.text)
+    os.replace(DISCOVERY_CACHE + ".tmp", DISCOVERY_CACHE)
+    return resp.text
+
+
+def build_youtube(discovery_doc: str):
+    """
+    Builds a YouTube Data API client, from the discovery document if available (no network).
+    """
+    if discovery_doc:
+        return build_from_document(discovery_doc, developerKey=DEVELOPER_KEY)
+    return build("youtube", "v3", developerKey=DEVELOPER_KEY, cache_discovery=False)
+
+
+def init_worker(discovery_doc="", driver_path=None):
+    """
+    Pool initializer: keeps the discovery document and chromedriver path resolved by main().
+    It must not raise (multiprocessing.Pool would restart the worker forever), so Chrome and
+    the API client are started by start_worker() on the first channel of the worker.
+    The driver is quit when the worker exits, also on pool.terminate() (SIGTERM -> SystemExit,
+    which the scraping code lets through: it only catches Exception).
+    """
+    global _worker_args
+    _worker_args = (discovery_doc, driver_path)
+    Finalize(None, _quit_worker_driver, exitpriority=10)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+
+def start_worker():
+    """
+    Starts the Chrome of this worker process and builds its API client
+    (once per worker, not per channel). Raises if one of them cannot be started.
+    """
+    global _worker_driver, _worker_youtube, _worker_api_executor
+    discovery_doc, driver_path = _worker_args
+    if _worker_youtube is None:
+        _worker_youtube = build_youtube(discovery_doc)
+    if _worker_api_executor is None:
+        # A single thread: the API client (httplib2) must not be used by two threads at once
+        _worker_api_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    if _worker_driver is None:
+        _worker_driver = get_webdriver(driver_path)
+
+
+def process_channel_in_worker(raw_channel_handle):
+    """
+    Runs process_channel with the driver and API client of the worker.
+    Returns (raw_channel_handle, data); data is None if the processing must stop
+    (quotaExceeded, or Chrome/the API client could not be started), False if only this
+    channel failed (it is not saved, so the next run processes it again).
+    """
+    try:
+        start_worker()
+    except Exception as e:
+        print(f"!!! Could not start the worker (Chrome / API client): {e!r}")
+        return raw_channel_handle, None
+
+    try:
+        return raw_channel_handle, process_channel(_worker_driver, _worker_youtube, raw_channel_handle, _worker_api_executor)
+    except HttpError:
+        return raw_channel_handle, None
+    except Exception as e:
+        print(f"!!! Error processing channel {raw_channel_handle}, skipping it: {e!r}")
+        return raw_channel_handle, False
+
+
+# Columns of the output file
+OUTPUT_HEADERS = [
+    "channel_handle_in_excel",
+    "channel_id",
+    "channel_name",
+    "first_last_name",
+    "city_country",
+    "email",
+    "num_subscribers",
+    "total_videos",
+    "num_videos",
+    "num_shorts",
+    "total_views",
+    "channel_creation_date_api",
+    "channel_country_api",
+    "channel_topics_api",
+    "first_video_published_api",
+    "last_video_published_api",
+    "num_following_channels",
+    "estimated_likes",
+    "estimated_comments"
+]
+# Columns written as numbers in the Excel file (the CSV only has text)
+NUMERIC_COLUMNS = {
+    "num_subscribers", "total_videos", "num_videos", "num_shorts", "total_views",
+    "num_following_channels", "estimated_likes", "estimated_comments"
+}
+
+
+def export_csv_to_xlsx():
+    """
+    Converts the progress file CSV_OUTPUT to XLSX_OUTPUT (write-only workbook, single save).
+    """
+    if not os.path.exists(CSV_OUTPUT):
+        return
+
+    wb_out = Workbook(write_only=True)
+    ws_out = wb_out.create_sheet("Channels")
+    with open(CSV_OUTPUT, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header_out = next(reader, [])
+        numeric = [name in NUMERIC_COLUMNS for name in header_out]
+        ws_out.append(header_out)
+        for row in reader:
+            row_out = []
+            for is_numeric, value in zip(numeric, row):
+                if value == "":
+                    value = None
+                elif is_numeric:
+                    try:
+                        value = int(value)
+                    except ValueError:
+                        pass
+                row_out.append(value)
+            ws_out.append(row_out)
 
+    try:
+        wb_out.save(XLSX_OUTPUT)
+        print(f"[LOG] => Exported {CSV_OUTPUT} to {XLSX_OUTPUT}.")
+    except PermissionError as e:
+        print(f"[LOG] => Could not save {XLSX_OUTPUT}: {e}. The results are kept in {CSV_OUTPUT}.")
+
+
+def main():
     if not os.path.exists(XLSX_INPUT):
         print(f"Input file not found: {XLSX_INPUT}")
         return
 
-    # Load the input workbook
-    wb_in = load_workbook(XLSX_INPUT)
+    # Load the input workbook (read-only: the rows are streamed, no cell objects are kept)
+    wb_in = load_workbook(XLSX_INPUT, read_only=True, data_only=True)
     ws_in = wb_in.active
 
     # Find the "channel_handle" column in the input file
-    header_in = [cell.value for cell in next(ws_in.iter_rows(min_row=1, max_row=1))]
+    header_in = list(next(ws_in.iter_rows(min_row=1, max_row=1, values_only=True), ()))
     try:
         channel_index = header_in.index("channel_handle")
     except ValueError:
         print("No 'channel_handle' column found in the file. Exiting.")
+        wb_in.close()
         return
 
-    # Prepare the output workbook
-    already_processed = set()  # set of processed channels
-    if os.path.exists(XLSX_OUTPUT):
-        # If the file already exists, open it and read "channel_handle_in_excel"
-        wb_out = load_workbook(XLSX_OUTPUT)
-        ws_out = wb_out.active
-
-        # We assume that headers already exist in the first row
-        header_out = [cell.value for cell in next(ws_out.iter_rows(min_row=1, max_row=1))]
-        if "channel_handle_in_excel" not in header_out:
-            print(f"[LOG] -> The required column 'channel_handle_in_excel' not found in {XLSX_OUTPUT}. Exiting.")
-            driver.quit()
-            return
-
-        # Find the index of column channel_handle_in_excel
-        try:
-            handle_col_index = header_out.index("channel_handle_in_excel") + 1
-        except ValueError:
-            print(f"[LOG] -> Column 'channel_handle_in_excel' is missing in the output file. Exiting.")
-            driver.quit()
-            return
-
-        # Read all values from that column, except the header
-        for row in ws_out.iter_rows(min_row=2, values_only=True):
-            if row and row[0]:
-                already_processed.add(str(row[0]))
+    # Only the "channel_handle" column is read
+    input_handles = [
+        row[0] for row in ws_in.iter_rows(
+            min_row=2, min_col=channel_index + 1, max_col=channel_index + 1, values_only=True
+        )
+    ]
+    wb_in.close()
+
+    # Prepare the progress file (CSV): each processed channel is appended as one row
+    already_processed = set()  # set of processed channels (normalize_handle_key)
+    if os.path.exists(CSV_OUTPUT):
+        # If the file already exists, read "channel_handle_in_excel"
+        with open(CSV_OUTPUT, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header_out = next(reader, [])
+            if "channel_handle_in_excel" not in header_out:
+                print(f"[LOG] -> The required column 'channel_handle_in_excel' not found in {CSV_OUTPUT}. Exiting.")
+                return
+            handle_col_index = header_out.index("channel_handle_in_excel")
+            for row in reader:
+                if len(row) > handle_col_index and row[handle_col_index]:
+                    already_processed.add(normalize_handle_key(row[handle_col_index]))
     else:
-        # If the file does not exist, create a new one
-        wb_out = Workbook()
-        ws_out = wb_out.active
-        ws_out.title = "Channels"
-
-        # Create headers for the output file
-        headers = [
-            "channel_handle_in_excel",
-            "channel_id",
-            "channel_name",
-            "first_last_name",
-            "city_country",
-            "email",
-            "num_subscribers",
-            "total_videos",
-            "num_videos",
-            "num_shorts",
-            "total_views",
-            "channel_creation_date_api",
-            "channel_country_api",
-            "channel_topics_api",
-            "first_video_published_api",
-            "last_video_published_api",
-            "num_following_channels",
-            "estimated_likes",
-            "estimated_comments"
-        ]
-        ws_out.append(headers)
-        # Save immediately so that the file appears on disk
-        wb_out.save(XLSX_OUTPUT)
+        # If the file does not exist, create it; the rows of an existing
+        # output Excel (runs before the CSV file) are streamed over (read-only mode)
+        wb_old = None
+        if os.path.exists(XLSX_OUTPUT):
+            wb_old = load_workbook(XLSX_OUTPUT, read_only=True)
+            ws_old = wb_old.active
+            header_old = list(next(ws_old.iter_rows(min_row=1, max_row=1, values_only=True), ()))
+            if "channel_handle_in_excel" not in header_old:
+                print(f"[LOG] -> The required column 'channel_handle_in_excel' not found in {XLSX_OUTPUT}. Exiting.")
+                wb_old.close()
+                return
+
+        with open(CSV_OUTPUT, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(OUTPUT_HEADERS)
+            if wb_old is not None:
+                for row in ws_old.iter_rows(min_row=2, values_only=True):
+                    if row and row[0]:
+                        writer.writerow(row)
+                        already_processed.add(normalize_handle_key(row[0]))
+                wb_old.close()
+
+    # Collect the channels to process (skipping the ones already in the output file)
+    handles = []
+    for raw_channel_handle in input_handles:
+        if not raw_channel_handle:
+            continue
+
+        # If already processed (or queued) this channel, skip; the same channel
+        # may be written as '@handle', '/@handle' or a full URL
+        handle_key = normalize_handle_key(raw_channel_handle)
+        if handle_key in already_processed:
+            print(f"[LOG] => Channel {raw_channel_handle} is already in {CSV_OUTPUT}, skipping.")
+            continue
+
+        if MAX_CHANNELS is not None and len(handles) >= MAX_CHANNELS:
+            print(f"[LOG] => Limit reached: {MAX_CHANNELS} channels to process. Breaking out of the loop.")
+            break
 
+        handles.append(raw_channel_handle)
+        already_processed.add(handle_key)
+
+    if not handles:
+        print("[LOG] => No new channels to process.")
+        export_csv_to_xlsx()
+        return
+
+    print(f"[LOG] => {len(handles)} channels to process with {NUM_WORKERS} workers.")
     count_processed = 0
+    count_failed = 0  # channels that failed with an unexpected error (not saved)
+    discovery_doc = load_discovery_document()
+    driver_path = resolve_chromedriver_path()
+    pool = multiprocessing.Pool(
+        processes=min(NUM_WORKERS, len(handles)), initializer=init_worker, initargs=(discovery_doc, driver_path)
+    )
+    csv_out = open(CSV_OUTPUT, "a", newline="", encoding="utf-8")
+    writer = csv.writer(csv_out)
 
     try:
-        for i, row in enumerate(ws_in.iter_rows(min_row=2, values_only=True), start=1):
-            if MAX_CHANNELS is not None and count_processed >= MAX_CHANNELS:
-                print(f"[LOG] => Limit reached: {MAX_CHANNELS} channels processed. Breaking out of the loop.")
+        # The workers only return the data, the output file is written here (single writer)
+        for raw_channel_handle, data in pool.imap_unordered(process_channel_in_worker, handles):
+            if data is None:
+                # If we got here, it means quotaExceeded (or another critical error, e.g. Chrome did not start)
+                print("[LOG] => Stopping the loop due to quotaExceeded or a critical error.")
                 break
-
-            raw_channel_handle = row[channel_index]
-            if not raw_channel_handle:
-                continue
-
-            # If already processed this channel, skip
-            if raw_channel_handle in already_processed:
-                print(f"[LOG] => Channel {raw_channel_handle} is already in {XLSX_OUTPUT}, skipping.")
+            if data is False:
+                # This channel failed (logged by the worker), the others go on
+                count_failed += 1
                 continue
 
-            print(f"\n=== [{i}] Processing channel from Excel: {raw_channel_handle} ===")
-            try:
-                data = process_channel(driver, raw_channel_handle)
-            except HttpError:
-                # If we got here, it means quotaExceeded (or another critical error)
-                print("[LOG] => Stopping the loop due to quotaExceeded or critical API error.")
-                break
-
             # Build a row for the final table
             row_out = [
                 raw_channel_handle,                # handle from Excel
-                data["channel_id"],
-                data["channel_name"],
-                data["first_last_name"],
-                data["city_country"],
-                data["email"],
-                data["num_subscribers"],
-                data["total_videos"],
-                data["num_videos"],
-                data["num_shorts"],
-                data["total_views"],
-                data["channel_creation_date_api"],
-                data["channel_country_api"],
-                data["channel_topics_api"],
-                data["first_video_published_api"],
-                data["last_video_published_api"],
-                data["num_following_channels"],
-                data["estimated_likes"],
-                data["estimated_comments"]
+                data.channel_id,
+                data.channel_name,
+                data.first_last_name,
+                data.city_country,
+                data.email,
+                data.num_subscribers,
+                data.total_videos,
+                data.num_videos,
+                data.num_shorts,
+                data.total_views,
+                data.channel_creation_date_api,
+                data.channel_country_api,
+                data.channel_topics_api,
+                data.first_video_published_api,
+                data.last_video_published_api,
+                data.num_following_channels,
+                data.estimated_likes,
+                data.estimated_comments
             ]
 
-            # Append this row to the output Excel
-            ws_out.append(row_out)
-            wb_out.save(XLSX_OUTPUT)  # Save after each record to avoid losing data
-
-            # Add to the set of processed channels
-            already_processed.add(raw_channel_handle)
+            # Append this row to the progress file (flushed after each record to avoid losing data)
+            writer.writerow(row_out)
+            csv_out.flush()
 
             count_processed += 1
+            print(f"[LOG] => [{count_processed}/{len(handles)}] Saved channel: {raw_channel_handle}")
 
     finally:
-        # Close the driver in any case
-        driver.quit()
+        # All channels done: let the workers exit normally (they quit their Chrome),
+        # otherwise (quotaExceeded, Ctrl+C) stop them right away
+        if count_processed + count_failed == len(handles):
+            pool.close()
+        else:
+            pool.terminate()
+        pool.join()
+        csv_out.close()
+
+    if count_failed:
+        print(f"[LOG] => {count_failed} channels failed and were not saved, the next run processes them again.")
+
+    # Write the Excel file once, from the progress file
+    export_csv_to_xlsx()
 
     print("[i] Data recording is complete.")
     print("Done!")